@@ -0,0 +1,62 @@
+#Benchmark del retardo de grupo: suma de los aportes de ceros y polos (FrequencyResponse.group_delay) vs.
+#derivada numerica de la fase con np.gradient y vs. el gd_at anterior (N y D expandidos derivados con Horner)
+#Uso (desde la raiz del repo): python -m benchmarks.group_delay [puntos] [repeticiones]
+import sys
+import time
+
+import numpy as np
+import scipy.signal as signal
+
+from src.package.transfer_function import TFunction, poly_at
+
+
+def legacy_gd_at(tf, w0):
+    if not tf.computedDerivatives:
+        tf.getDerivatives()
+    return -np.imag(1j*(poly_at(tf.dN, 1j*w0)/poly_at(tf.N, 1j*w0) - poly_at(tf.dD, 1j*w0)/poly_at(tf.D, 1j*w0)))
+
+
+#Fase sumada raiz por raiz (no se desborda en orden alto), desenrollada y derivada numericamente
+def gradient_gd(z, p, w):
+    s = 1j * w[:, np.newaxis]
+    phase = np.sum(np.angle(s - z), axis=1) - np.sum(np.angle(s - p), axis=1)
+    return -np.gradient(np.unwrap(phase), w)
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+#Error maximo relativo al maximo del retardo de referencia (nan si gd tiene NaN)
+def relative_error(gd, reference):
+    return np.max(np.abs(gd - reference)) / np.max(np.abs(reference))
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    w = np.logspace(-2, 6, points) * 2 * np.pi
+    print(f'{points} points, best of {repeat}; err gradient vs. np.gradient of the phase, err legacy vs. gd_at')
+    print(f'{"filter":>14} {"roots":>8} {"gd_at":>10} {"gradient":>10} {"legacy":>10} {"err gradient":>13} {"err legacy":>11}')
+    for order in [4, 8, 16, 30, 50]:
+        z, p, k = signal.ellip(order, 1, 60, 2 * np.pi * 1e3, analog=True, output='zpk')
+        tf = TFunction(z, p, k)
+
+        t_new, gd = best_time(lambda: tf.gd_at(w), repeat)
+        t_gradient, reference = best_time(lambda: gradient_gd(tf.z, tf.p, w), repeat)
+        with np.errstate(all='ignore'):
+            t_legacy, legacy = best_time(lambda: legacy_gd_at(tf, w), repeat)
+
+        #np.gradient es de segundo orden: se compara donde la grilla es lo bastante fina respecto al retardo
+        fine = np.abs(np.gradient(w) * reference) < 1e-2
+        print(f'{f"ellip {order}":>14} {len(z) + len(p):>8} {t_new * 1e3:8.2f}ms {t_gradient * 1e3:8.2f}ms {t_legacy * 1e3:8.2f}ms'
+              f' {relative_error(gd[fine], reference[fine]):13.1e} {relative_error(legacy, gd):11.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#Benchmark del parser de .txt de LTspice: parser por linea original vs. parser por bloques
+#Uso (desde la raiz del repo): python -m benchmarks.txt_parser [filas_por_caso] [casos]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
+from src.package.Dataset import Dataset
+import src.package.ParseCache as ParseCache
+
+
+def legacy_parse_from_txt(filepath):
+    data = []
+    casenames = []
+    with open(filepath, mode='r') as file:
+        fields = file.readline().replace('\n', '').split('\t')
+        case = -1
+        for line in file.readlines():
+            if('Step Information:' in line):
+                data.append(defaultdict(list))
+                casenames.append(line[18:line.index('  (Run: ')])
+                case += 1
+            else:
+                linedata = line.replace('\n', '').split('\t')
+                for x in range(len(fields)):
+                    if('i' in linedata[x]):
+                        data[case][fields[x]].append(np.complex128(linedata[x]))
+                    else:
+                        data[case][fields[x]].append(float(linedata[x]))
+    return data, casenames
+
+
+def write_step_export(filepath, rows, cases, traces=3):
+    t = np.linspace(0, 1e-3, rows)
+    with open(filepath, mode='w') as file:
+        file.write('\t'.join(['time'] + [f'V(n{x:03d})' for x in range(traces)]) + '\n')
+        for case in range(cases):
+            file.write(f'Step Information: R1={case + 1}k  (Run: {case + 1}/{cases})\n')
+            block = np.column_stack([t] + [np.sin(2e4 * np.pi * t * (x + 1)) * (case + 1) for x in range(traces)])
+            np.savetxt(file, block, delimiter='\t', fmt='%.15e')
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cases = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    #Las filas block y lazy se miden sin cache de parseo; el cache va en su propia fila, en una carpeta temporal
+    ParseCache.PARSE_CACHE = False
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ParseCache.CACHE_DIR = os.path.join(tmpdir, 'parse-cache')
+        filepath = os.path.join(tmpdir, 'bench.txt')
+        write_step_export(filepath, rows, cases)
+        size = os.path.getsize(filepath) / 2**20
+        total = rows * cases
+        print(f'{total} rows in {cases} cases ({size:.1f} MB)')
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        legacy, legacy_names = legacy_parse_from_txt(filepath)
+        t_legacy = time.perf_counter() - t0
+        mem_legacy = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0] / 2**20
+
+        t0 = time.perf_counter()
+        ds = Dataset(filepath=filepath, lazy=False)
+        t_new = time.perf_counter() - t0
+        mem_new = tracemalloc.get_traced_memory()[1] / 2**20 - baseline
+        tracemalloc.stop()
+
+        t0 = time.perf_counter()
+        lazy = Dataset(filepath=filepath)
+        t_lazy = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        lazy.get_datapoints(lazy.fields[0], lazy.fields[1], cases - 1)
+        t_column = time.perf_counter() - t0
+
+        ParseCache.PARSE_CACHE = True
+        t0 = time.perf_counter()
+        Dataset(filepath=filepath)
+        t_store = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cached = Dataset(filepath=filepath)
+        t_cached = time.perf_counter() - t0
+
+        assert ds.casenames == legacy_names == lazy.casenames == cached.casenames
+        for case in range(cases):
+            for field in ds.fields:
+                assert np.array_equal(ds.data[case][field], legacy[case][field])
+                assert np.array_equal(lazy.data[case][field], legacy[case][field])
+                assert np.array_equal(cached.data[case][field], legacy[case][field])
+        del cached
+
+        print(f'legacy: {t_legacy:8.3f} s  {total / t_legacy:12.0f} rows/s  peak {mem_legacy:8.1f} MB')
+        print(f'block:  {t_new:8.3f} s  {total / t_new:12.0f} rows/s  peak {mem_new:8.1f} MB  (x{t_legacy / t_new:.1f})')
+        print(f'lazy:   {t_lazy:8.3f} s to index, {t_column:.3f} s to decode one case/column pair')
+        print(f'cache:  {t_store:8.3f} s to parse and store, {t_cached:.3f} s to reopen from the parse cache')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
+# Python modules
+import multiprocessing
+
 # Project modules
 from src.app import main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() #Necesario para el pool de importacion en el ejecutable de PyInstaller
     main()
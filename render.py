@@ -0,0 +1,38 @@
+# Python modules
+import sys
+import time
+import argparse
+import multiprocessing
+
+# Project modules
+import src.package.BatchRender as BatchRender
+
+#Renderiza los graficos de proyectos .fto sin abrir la interfaz:
+#    python render.py proyecto.fto [otro.fto ...] -o figuras -f png pdf
+def main():
+    parser = argparse.ArgumentParser(description='Render every plot of saved .fto projects without opening the GUI.')
+    parser.add_argument('projects', nargs='+', help='.fto files')
+    parser.add_argument('-o', '--outdir', default='.', help='output folder')
+    parser.add_argument('-f', '--formats', nargs='+', default=['png'], choices=BatchRender.FORMATS, help='output formats')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='parallel processes')
+    parser.add_argument('--size', type=float, nargs=2, default=None, metavar=('WIDTH', 'HEIGHT'), help='figure size in inches')
+    parser.add_argument('--dpi', type=float, default=None)
+    parser.add_argument('--full-resolution', action='store_true', help='save decimated lines with all their samples')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = 0
+    failures = 0
+    for (filepath, slot, written, seconds, errors) in BatchRender.render_projects(args.projects, args.outdir, args.formats,
+                                                                                  args.workers, args.size, args.dpi, args.full_resolution):
+        count += 1
+        print(f'{filepath} {BatchRender.SLOT_NAMES[slot]}: {seconds:.2f}s {", ".join(written)}')
+        for error in errors:
+            failures += 1
+            print(f'    {error}', file=sys.stderr)
+    print(f'{count} figures in {time.perf_counter() - start:.2f}s')
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
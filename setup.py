@@ -6,12 +6,14 @@ if sys.platform == 'win32' or sys.platform == 'cygwin':
         'main.py',
         '--onefile',
         '--windowed',
-        '--add-data=info.png;.'
+        '--add-data=info.png;.',
+        '--add-data=src/pyqt-labutils-master/misc.py;src/pyqt-labutils-master'
     ])
 else:
     PyInstaller.__main__.run([
         'main.py',
         '--onefile',
         '--windowed',
-        '--add-data=info.png:.'
+        '--add-data=info.png:.',
+        '--add-data=src/pyqt-labutils-master/misc.py:src/pyqt-labutils-master'
     ])
\ No newline at end of file
@@ -1,13 +1,20 @@
 # PyQt5 modules
 from math import inf
-from PyQt5.QtWidgets import QMainWindow, QListWidgetItem, QColorDialog, QFileDialog, QDialog, QStyle
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QMainWindow, QListWidgetItem, QColorDialog, QFileDialog, QDialog, QStyle, QMessageBox, QInputDialog
+from PyQt5.QtCore import Qt, QTimer
 
 # Project modules
 from src.ui.mainwindow import Ui_MainWindow
 from src.package.Dataset import Dataset
+import src.package.Importer as Importer
+from src.widgets.import_dialog import FileImportTask
+from src.widgets.export_dialog import FigureExportTask
+import src.package.FigureExport as FigureExport
 import src.package.Filter as Filter
 from src.package.Filter import AnalogFilter
+from src.package.RedrawScheduler import RedrawScheduler
+from src.package.PlotRenderer import apply_general_config
+import src.package.Autosave as Autosave
 from src.widgets.exprwidget import MplCanvas
 from src.widgets.tf_dialog import TFDialog
 from src.widgets.case_window import CaseDialog
@@ -15,11 +22,9 @@ from src.widgets.zp_window import ZPWindow
 from src.widgets.response_dialog import ResponseDialog
 from src.widgets.prompt_dialog import PromptDialog
 
-from scipy.signal import savgol_filter
 import scipy.signal as signal
 from scipy.interpolate import splrep, splev, splprep
 import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
 from mplcursors import HoverMode, cursor, Selection
 from matplotlib.patches import Rectangle
 
@@ -29,8 +34,6 @@ from pyparsing.exceptions import ParseSyntaxException
 
 import pickle
 
-MARKER_STYLES = { 'None': '', 'Point': '.',  'Pixel': ',',  'Circle': 'o',  'Triangle down': 'v',  'Triangle up': '^',  'Triangle left': '<',  'Triangle right': '>',  'Tri down': '1',  'Tri up': '2',  'Tri left': '3',  'Tri right': '4',  'Octagon': '8',  'Square': 's',  'Pentagon': 'p',  'Plus (filled)': 'P',  'Star': '*',  'Hexagon': 'h',  'Hexagon alt.': 'H',  'Plus': '+',  'x': 'x',  'x (filled)': 'X',  'Diamond': 'D',  'Diamond (thin)': 'd',  'Vline': '|',  'Hline': '_' }
-LINE_STYLES = { 'None': '', 'Solid': '-', 'Dashed': '--', 'Dash-dot': '-.', 'Dotted': ':' }
 
 POLE_COLOR = '#FF0000'
 POLE_SEL_COLOR = '#00FF00'
@@ -69,6 +72,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         super(MainWindow, self).__init__()
         self.setupUi(self)
         self.droppedFiles = []
+        self.importTasks = []
+        self.exportTasks = []
         self.datasets = []
         self.datalines = []
         # self.stage_datasets = [] capaz mas adelante lo ponga para serializar también las etapas, pero creo que para ahora es mucho
@@ -104,6 +109,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dl_remove_btn.clicked.connect(self.removeSelectedDataline)
         self.dl_savgol_wlen.valueChanged.connect(self.updateSelectedDataline)
         self.dl_savgol_ord.valueChanged.connect(self.updateSelectedDataline)
+        self.dl_decimation_cb.activated.connect(self.updateSelectedDataline)
 
         self.dl_color_pickerbtn.clicked.connect(self.openColorPicker)
 
@@ -128,7 +134,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.plt_autoscale.clicked.connect(self.autoscalePlots)
         self.plt_legendpos.activated.connect(self.updatePlots)
         self.plt_grid.stateChanged.connect(self.updatePlots)
-        self.tabbing_plots.currentChanged.connect(self.updatePlots)
+        self.tabbing_plots.currentChanged.connect(self.flushPlots)
         
         self.plots_canvases = [
             [ self.plot_1 ],
@@ -137,6 +143,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             [ self.plot_4_1, self.plot_4_2 ],
             [ self.plot_5 ],
         ]
+        self.redraws = RedrawScheduler(
+            [plot.canvas for tab in self.plots_canvases for plot in tab],
+            self.getAllDatalines,
+            self.redrawCanvas,
+            self.getVisibleCanvases,
+        )
+        #Junta los cambios seguidos (por ejemplo mantener apretada la flecha de un spinbox) en un solo redibujo
+        self.redrawTimer = QTimer(self)
+        self.redrawTimer.setSingleShot(True)
+        self.redrawTimer.timeout.connect(self.flushPlots)
 
         self.new_filter_btn.clicked.connect(self.addFilter)
         self.chg_filter_btn.clicked.connect(self.changeSelectedFilter)
@@ -149,6 +165,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.actionLoad_2.triggered.connect(self.loadFile)
         self.actionSave_2.triggered.connect(self.saveFile)
+        self.actionExport_all.triggered.connect(self.exportAllPlots)
 
         self.stageCursorZer = {}
         self.stageCursorPol = {}
@@ -171,6 +188,36 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.prevFilterType = Filter.LOW_PASS
         self.compareapprox_cb.setCurrentIndexes([])
 
+        self.autosave = Autosave.Autosave()
+        QTimer.singleShot(0, self.offerSessionRecovery)
+
+    #Si la ultima vez el programa se cerro mal, ofrece recuperar lo que habia quedado en el autoguardado
+    def offerSessionRecovery(self):
+        sessions = Autosave.crashed_sessions()
+        if not sessions:
+            return
+        box = QMessageBox(QMessageBox.Question, 'Recover session', 'The previous session was not closed properly. Recover it?',
+                          QMessageBox.Yes | QMessageBox.No, self)
+        box.finished.connect(lambda result: self.resolveSessionRecovery(result == QMessageBox.Yes, sessions))
+        box.open()
+
+    def resolveSessionRecovery(self, recover, sessions):
+        if recover:
+            try:
+                datasets, plotdata, general_config, missing = Autosave.load_session(sessions[0])
+                self.restoreSession(datasets, [list(ds.datalines) for ds in datasets], plotdata, general_config)
+            except Exception:
+                self.statusbar.showMessage('Could not recover the previous session', 4000)
+                return
+            if missing:
+                QMessageBox.warning(self, 'Recover session', 'These files changed or are no longer available:\n' + '\n'.join(missing))
+        for session in sessions:
+            Autosave.discard_session(session)
+
+    def closeEvent(self, event):
+        self.autosave.close()
+        super().closeEvent(event)
+
     def addDataset(self, ds):
         qlwt = QListWidgetItem()
         qlwt.setData(Qt.UserRole, ds)
@@ -205,8 +252,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.stages_selfil_cb.removeItem(fi)
             if(self.selfil_cb.count() == 0):
                 self.chg_filter_btn.setEnabled(False)
+        self.redraws.mark_dataset(ds)
         self.dataset_list.takeItem(i)
-        self.updatePlots()
+        self.flushPlots()
 
     def addDataline(self):
         if(not self.selected_dataset_data):
@@ -224,12 +272,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dataline_list.insertItem(dli, qlwt)
         self.dataline_list.setCurrentRow(dli)
         self.datalines[self.dataset_list.currentRow()].append(dl)
+        self.redraws.mark_dataline(dl)
         self.updateSelectedDataline()
-        self.updatePlots()
+        self.flushPlots()
 
     def removeDataline(self, i):        
         try:
             dsi, dli = self.getInternalDataIndexes(i)
+            self.redraws.mark_dataline(self.datalines[dsi][dli])
             del self.datalines[dsi][dli]
             self.dataline_list.takeItem(i).data(Qt.UserRole)
             del self.dataset_list.item(dsi).data(Qt.UserRole).datalines[dli]
@@ -237,7 +287,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.dataline_list.setCurrentRow(self.dataline_list.count() - 1)
         except AttributeError:
             pass
-        self.updatePlots()
+        self.flushPlots()
     
     def removeSelectedDataline(self, event):
         selected_row = self.dataline_list.currentRow()
@@ -275,19 +325,33 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.processFiles(files)
 
     def processFiles(self, filenamearray):
-        for f in filenamearray:
-            try:
-                ds = Dataset(filepath=f)
-                dataset_items_origin = [
-                    self.dataset_list.item(x).data(Qt.UserRole).origin
-                    for x in range(self.dataset_list.count())
-                ]
-                if(ds.origin not in dataset_items_origin):
-                    self.droppedFiles.append(ds.origin)
-                    self.addDataset(ds)
-            except(ValueError):
-                print('Wrong file config')
-        self.statusbar.clearMessage()
+        dataset_items_origin = [
+            self.dataset_list.item(x).data(Qt.UserRole).origin
+            for x in range(self.dataset_list.count())
+        ]
+        importing = [f for task in self.importTasks for f in task.filepaths]
+        filenamearray = Importer.dedupe_paths(filenamearray, dataset_items_origin + importing)
+        if not filenamearray:
+            self.statusbar.clearMessage()
+            return
+        task = FileImportTask(filenamearray, parent=self)
+        task.sig_dataset.connect(self.addImportedDataset)
+        task.sig_finished.connect(lambda: self.finishImport(task))
+        self.importTasks.append(task)
+        task.start()
+
+    def addImportedDataset(self, filepath, ds):
+        if(isinstance(ds, Exception)):
+            return #Queda en task.failed y se avisa al terminar
+        self.droppedFiles.append(ds.origin)
+        self.addDataset(ds)
+
+    def finishImport(self, task):
+        self.importTasks.remove(task)
+        if not self.importTasks:
+            self.statusbar.clearMessage()
+        if task.failed:
+            QMessageBox.warning(self, 'Import files', '\n'.join(task.failed))
 
     def openTFDialog(self):
         self.tfd.open()
@@ -331,6 +395,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.selected_dataset_data.fields.append(time_title)
         self.selected_dataset_data.fields.append(title)
         self.selected_dataset_data.fields.append(ans_title)
+        self.redraws.mark_dataset(self.selected_dataset_data)
         
         self.updateSelectedDataset()
         self.updateSelectedDataline()
@@ -714,7 +779,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             qlwt.setData(Qt.UserRole, dl)
             self.dataline_list.insertItem(dli, qlwt)
             self.datalines[self.dataset_list.currentRow()].append(dl)
-        self.updatePlots()
+            self.redraws.mark_dataline(dl)
+        self.flushPlots()
 
     def populateSelectedDatasetDetails(self, listitemwidget, qlistwidget):
         if(not listitemwidget):
@@ -791,6 +857,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dl_color_label.setStyleSheet(f'background-color: {self.selected_dataline_data.color}')
         self.dl_savgol_wlen.setValue(self.selected_dataline_data.savgolwindow)
         self.dl_savgol_ord.setValue(self.selected_dataline_data.savgolord)
+        self.dl_decimation_cb.setCurrentIndex(self.selected_dataline_data.decimation)
         
         self.dl_xscale_sb.blockSignals(False)
         self.dl_yscale_sb.blockSignals(False)
@@ -802,7 +869,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dl_savgol_ord.blockSignals(False)
 
     def updateSelectedDataline(self):
-        self.saveFile(True)
         if(not self.selected_dataline_widget):
             return
         new_name = self.dl_name_edit.text()
@@ -823,8 +889,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.selected_dataline_data.markersize = self.dl_markersize_sb.value()
         self.selected_dataline_data.savgolwindow = self.dl_savgol_wlen.value()
         self.selected_dataline_data.savgolord = self.dl_savgol_ord.value()
+        self.selected_dataline_data.decimation = self.dl_decimation_cb.currentIndex()
+        self.redraws.mark_dataline(self.selected_dataline_data)
         self.populateSelectedDatalineDetails(self.selected_dataline_widget, None)
-        self.updatePlots()
+        self.schedulePlots()
 
     
     def openColorPicker(self):
@@ -838,7 +906,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dl_color_edit.setText(color.name())
         self.dl_color_label.setStyleSheet(f'background-color: {color.name()}')
         self.selected_dataline_data.color = color.name()
-        self.updatePlots()
+        self.redraws.mark_dataline(self.selected_dataline_data)
+        self.schedulePlots()
 
     def setDatasetControlsStatus(self, enabled=True):
         self.ds_title_edit.setEnabled(enabled)
@@ -864,6 +933,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.dl_markersize_sb.setEnabled(enabled)
         self.dl_savgol_wlen.setEnabled(enabled)
         self.dl_savgol_ord.setEnabled(enabled)
+        self.dl_decimation_cb.setEnabled(enabled)
         self.dl_remove_btn.setEnabled(enabled)
 
     def getPlotFromIndex(self, plotnum):
@@ -881,92 +951,85 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         processedCanvas = [x.canvas for x in self.plots_canvases[self.tabbing_plots.currentIndex()]]
         for canvas in processedCanvas:
             canvas.ax.margins(self.plt_marginx.value(), self.plt_marginy.value())
+            canvas.plot_renderer.reset_view_data()
             canvas.ax.relim()
             canvas.ax.autoscale()
-        self.updatePlots()
+            self.redraws.mark_canvas(canvas)
+        self.flushPlots()
 
     def changeLabelSize(self):
         # plt.rcParams.update({'font.size': self.plt_labelsize_sb.value()})
         self.updatePlots()
 
+    def getDatasets(self):
+        return [self.dataset_list.item(x).data(Qt.UserRole) for x in range(self.dataset_list.count())]
+
+    def getAllDatalines(self):
+        return [dl for ds in self.getDatasets() for dl in ds.datalines]
+
+    def getVisibleCanvases(self):
+        return [x.canvas for x in self.plots_canvases[self.tabbing_plots.currentIndex()]]
+
+    #Redibuja todos los graficos a la vista, para cuando cambia algo comun a todos
     def updatePlots(self):
-        self.saveFile(True)
-        processedCanvas = [x.canvas for x in self.plots_canvases[self.tabbing_plots.currentIndex()]]
-        for canvas in processedCanvas:
-            plotlist = []
-            for artist in canvas.ax.lines + canvas.ax.collections:
-                artist.remove()
-            for x in range(self.dataset_list.count()):
-                ds = self.dataset_list.item(x).data(Qt.UserRole)
-                for dl in ds.datalines:
-                    dl_canvas = self.getPlotFromIndex(dl.plots).canvas
-                    if(dl_canvas == canvas):
-                        
-                        for label in (canvas.ax.get_xticklabels() + canvas.ax.get_yticklabels()):
-                            label.set_fontsize(self.plt_ticksize_sb.value())
-                        canvas.ax.xaxis.label.set_size(self.plt_labelsize_sb.value())
-                        canvas.ax.yaxis.label.set_size(self.plt_labelsize_sb.value())
-                        canvas.ax.title.set_size(self.plt_titlesize_sb.value())
-
-                        x, y = ds.get_datapoints(dl.xsource, dl.ysource, dl.casenum)
-
-                        if(dl.transform == 1):
-                            y = np.abs(y)
-                        elif(dl.transform == 2):
-                            y = np.angle(y, deg=True)
-                        elif(dl.transform == 3):
-                            y = np.unwrap(np.angle(y, deg=True), period=360)
-                        elif(dl.transform == 4):
-                            y = 20 * np.log10(y)
-                        elif(dl.transform == 5):
-                            y = 20 * np.log10(np.abs(y))
-                        elif(dl.transform == 6):
-                            y = np.unwrap(y, period=360)
-                        else:
-                            y = np.real(y)
-
-                        if(dl.transform in [2,3,6]):
-                            canvas.ax.yaxis.set_major_locator(ticker.MaxNLocator(nbins='auto', steps=[1.8,2.25,4.5,9]))
-                        else:
-                            canvas.ax.yaxis.set_major_locator(ticker.AutoLocator())
-
-                        try:
-                            savgolw = int(dl.savgolwindow)
-                            if(savgolw <= len(x)):
-                                savgolo = int(dl.savgolord)
-                                y = y if savgolw <= savgolo else savgol_filter(y, savgolw, savgolo)
-                        except ValueError:
-                            pass
-
-                        try:
-                            line, = canvas.ax.plot(
-                                x * dl.xscale + dl.xoffset,
-                                y * dl.yscale + dl.yoffset,
-                                linestyle = LINE_STYLES[dl.linestyle],
-                                linewidth = dl.linewidth,
-                                marker = MARKER_STYLES[dl.markerstyle],
-                                markersize = dl.markersize,
-                                color = dl.color,
-                                label = dl.name,
-                            )
-                            if(dl.name != '' and dl.name[0] != '_'):
-                                plotlist.append(line)
-                        except ValueError:
-                            # print(len(x), len(y))
-                            self.statusbar.showMessage('Wrong data source matching', 2000)
-            if(self.plt_legendpos.currentText() == 'None'):
-                canvas.ax.get_legend().remove()
-            else:
-                canvas.ax.legend(handles=plotlist, fontsize=self.plt_legendsize_sb.value(), loc=self.plt_legendpos.currentIndex())
-            if(self.plt_grid.isChecked()):
-                canvas.ax.grid(True, which="both", linestyle=':')
-            else:
-                canvas.ax.grid(False)
+        self.redraws.mark_all()
+        self.schedulePlots()
+
+    #Pide un redibujo para el proximo cuadro; los pedidos que llegan mientras tanto se juntan en ese
+    def schedulePlots(self):
+        if(not self.redrawTimer.isActive()):
+            self.redrawTimer.start(int(self.redraws.next_delay() * 1000))
+
+    #Redibuja ya los graficos marcados en self.redraws
+    def flushPlots(self):
+        self.redrawTimer.stop()
+        self.redraws.flush()
+        #Si falla el autoguardado se sigue dibujando igual
+        try:
+            self.autosave.record(self.getDatasets(), self.getPlotsData(), self.getGeneralConfig())
+            error = self.autosave.take_error()
+        except Exception as e:
+            error = e
+        if error is not None:
+            self.statusbar.showMessage(f'Autosave failed: {error}', 4000)
+
+    def redrawCanvas(self, canvas, datalines):
+        #Solo se crean/borran lineas si se agregaron/sacaron Datalines, el resto se actualiza en el lugar
+        plotlist, errors = canvas.plot_renderer.render(datalines)
+        if errors:
+            self.statusbar.showMessage('Wrong data source matching', 2000)
+        apply_general_config(canvas.ax, plotlist, self.getGeneralConfig(), fonts=bool(datalines))
 
-            try:
-                canvas.draw()
-            except ParseSyntaxException or ValueError:
-                pass
+        try:
+            canvas.draw()
+        except ParseSyntaxException or ValueError:
+            pass
+
+    #Exporta todos los graficos (de todas las pestañas) a una carpeta, en paralelo y sin bloquear la interfaz
+    def exportAllPlots(self):
+        outdir = QFileDialog.getExistingDirectory(self, "Export plots to")
+        if(not outdir): return
+        options = FigureExport.FORMATS + [', '.join(FigureExport.FORMATS)]
+        option, ok = QInputDialog.getItem(self, "Export plots", "Format", options, 0, False)
+        if(not ok): return
+        #Los graficos de otras pestañas pueden haber quedado sin redibujar
+        self.flushPlots()
+        self.redraws.flush(self.redraws.canvases)
+        config = self.getGeneralConfig()
+        shared = FigureExport.SharedArrays()
+        snapshots = [FigureExport.snapshot_canvas(canvas, slot, config, shared, canvas.export_full_resolution)
+                     for (slot, canvas) in enumerate(self.redraws.canvases)]
+        task = FigureExportTask(snapshots, shared, outdir, option.split(', '), parent=self)
+        task.sig_finished.connect(lambda: self.finishExport(task))
+        self.exportTasks.append(task)
+        task.start()
+
+    def finishExport(self, task):
+        self.exportTasks.remove(task)
+        if task.failed:
+            QMessageBox.warning(self, 'Export plots', '\n'.join(task.failed))
+        else:
+            self.statusbar.showMessage(f'Exported {len(task.results)} files to {task.outdir}', 4000)
 
     def showZPWindow(self):
         zeros = self.selected_dataset_data.zeros[0]
@@ -985,6 +1048,22 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.zpWindow = type(ZPWindow, (), {})()
         self.updateAll()
     
+    def getPlotsData(self):
+        flat_plots_canvas = [item.canvas for sublist in self.plots_canvases for item in sublist]
+        return [canv.get_properties() for canv in flat_plots_canvas]
+
+    def getGeneralConfig(self):
+        return {
+            'labelsize_sb': self.plt_labelsize_sb.value(),
+            'legendsize_sb': self.plt_legendsize_sb.value(),
+            'ticksize_sb': self.plt_ticksize_sb.value(),
+            'titlesize_sb': self.plt_titlesize_sb.value(),
+            'legendpos': self.plt_legendpos.currentIndex(),
+            'grid': self.plt_grid.isChecked(),
+            'marginx': self.plt_marginx.value(),
+            'marginy': self.plt_marginy.value()      
+        }
+
     def saveFile(self, noprompt=False):
         if(noprompt):
             filename = 'temp.fto'
@@ -992,21 +1071,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             filename, _ = QFileDialog.getSaveFileName(self,"Save File", "","Filter tool file (*.fto)")
         if(not filename): return
         with open(filename, 'wb') as f:
-            flat_plots_canvas = [item.canvas for sublist in self.plots_canvases for item in sublist]
-            plots_data = []
-            for canv in flat_plots_canvas:
-                plots_data.append(canv.get_properties())
-            general_config = {
-                'labelsize_sb': self.plt_labelsize_sb.value(),
-                'legendsize_sb': self.plt_legendsize_sb.value(),
-                'ticksize_sb': self.plt_ticksize_sb.value(),
-                'titlesize_sb': self.plt_titlesize_sb.value(),
-                'legendpos': self.plt_legendpos.currentIndex(),
-                'grid': self.plt_grid.isChecked(),
-                'marginx': self.plt_marginx.value(),
-                'marginy': self.plt_marginy.value()      
-            }
-            d = [self.datasets, self.datalines, plots_data, general_config]
+            d = [self.datasets, self.datalines, self.getPlotsData(), self.getGeneralConfig()]
             pickle.dump(d, f, pickle.HIGHEST_PROTOCOL)
 
     def loadFile(self):
@@ -1014,41 +1079,44 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if(not filename): return
         with open(filename, 'rb') as f:
             f.seek(0)
-            self.datasets, self.datalines, plotdata, general_config = pickle.load(f)            
-            self.plt_labelsize_sb.setValue(general_config['labelsize_sb'])
-            self.plt_legendsize_sb.setValue(general_config['legendsize_sb'])
-            self.plt_ticksize_sb.setValue(general_config['ticksize_sb'])
-            self.plt_titlesize_sb.setValue(general_config['titlesize_sb'])
-            self.plt_legendpos.setCurrentIndex(general_config['legendpos'])
-            self.plt_grid.setChecked(general_config['grid'])
-            self.plt_marginx.setValue(general_config['marginx'])
-            self.plt_marginy.setValue(general_config['marginy'])  
-            acc = 0   
-            for s in self.plots_canvases:
-                for p in s:
-                    p.canvas.restore_properties(plotdata[acc])
-                    acc += 1
-            for ds in self.datasets:
+            self.restoreSession(*pickle.load(f))
+
+    def restoreSession(self, datasets, datalines, plotdata, general_config):
+        self.datasets, self.datalines = datasets, datalines
+        self.plt_labelsize_sb.setValue(general_config['labelsize_sb'])
+        self.plt_legendsize_sb.setValue(general_config['legendsize_sb'])
+        self.plt_ticksize_sb.setValue(general_config['ticksize_sb'])
+        self.plt_titlesize_sb.setValue(general_config['titlesize_sb'])
+        self.plt_legendpos.setCurrentIndex(general_config['legendpos'])
+        self.plt_grid.setChecked(general_config['grid'])
+        self.plt_marginx.setValue(general_config['marginx'])
+        self.plt_marginy.setValue(general_config['marginy'])  
+        acc = 0   
+        for s in self.plots_canvases:
+            for p in s:
+                p.canvas.restore_properties(plotdata[acc])
+                acc += 1
+        for ds in self.datasets:
+            qlwt = QListWidgetItem()
+            qlwt.setData(Qt.UserRole, ds)
+            qlwt.setText(ds.title)
+            self.dataset_list.addItem(qlwt)
+            for dl in ds.datalines:
                 qlwt = QListWidgetItem()
-                qlwt.setData(Qt.UserRole, ds)
-                qlwt.setText(ds.title)
-                self.dataset_list.addItem(qlwt)
-                for dl in ds.datalines:
-                    qlwt = QListWidgetItem()
-                    qlwt.setData(Qt.UserRole, dl)
-                    qlwt.setText(dl.name)
-                    self.dataline_list.addItem(qlwt)
-                if(ds.type == 'filter'):
-                    self.filters.append(ds)
-                    self.selfil_cb.blockSignals(True)
-                    self.stages_selfil_cb.blockSignals(True)
-                    self.selfil_cb.addItem(ds.title, ds)
-                    self.stages_selfil_cb.addItem(ds.title, ds)
-                    self.selfil_cb.blockSignals(False)
-                    self.stages_selfil_cb.blockSignals(False)
-
-            self.dataset_list.setCurrentRow(self.dataset_list.count() - 1)
-            self.updateAll()
+                qlwt.setData(Qt.UserRole, dl)
+                qlwt.setText(dl.name)
+                self.dataline_list.addItem(qlwt)
+            if(ds.type == 'filter'):
+                self.filters.append(ds)
+                self.selfil_cb.blockSignals(True)
+                self.stages_selfil_cb.blockSignals(True)
+                self.selfil_cb.addItem(ds.title, ds)
+                self.stages_selfil_cb.addItem(ds.title, ds)
+                self.selfil_cb.blockSignals(False)
+                self.stages_selfil_cb.blockSignals(False)
+
+        self.dataset_list.setCurrentRow(self.dataset_list.count() - 1)
+        self.updateAll()
     
     def updateAll(self):
         self.updatePlots()
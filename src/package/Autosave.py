@@ -0,0 +1,257 @@
+import os
+import glob
+import pickle
+import queue
+import shutil
+import itertools
+import threading
+from PyQt5.QtCore import QStandardPaths, QLockFile
+from src.package.Dataline import Dataline
+from src.package.Dataset import Dataset
+
+#Guardado automatico de la sesion en un journal, en un hilo aparte. Cada sesion abierta tiene su carpeta
+#con un lock, un journal.log (registros pickle chicos, uno detras de otro) y un .pkl por Dataset.
+#Los Datasets se serializan una sola vez (y de nuevo solo si cambia alguna de sus columnas); despues solo
+#se agregan al journal los cambios en los Datalines, los graficos y la configuracion. De los que vienen de un
+#archivo solo se guarda de donde se abrieron y las columnas agregadas (ver FileDataset).
+#Al cerrar bien el programa se borra la carpeta; si quedo alguna sin lock es que el programa se cerro mal.
+AUTOSAVE_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation), 'TC2-PlotTool', 'autosave')
+JOURNAL = 'journal.log'
+LOCK = 'session.lock'
+
+#Tipos de Dataset que se pueden volver a abrir desde su archivo al recuperar la sesion
+FILE_TYPES = ['spice', 'txt', 'csv']
+
+#Cantidad de registros despues de la cual se reescribe el journal solo con el estado actual
+COMPACT_RECORDS = 500
+
+#Lo que no se guarda de un Dataline: el Dataset lo pone la recuperacion
+DATALINE_SKIP = ['dataset', 'dirty']
+
+def dataline_state(dl):
+    return {name: value for (name, value) in dl.__dict__.items() if name not in DATALINE_SKIP}
+
+#Copia superficial de un Dataset para serializarla en el otro hilo sin que la interfaz la modifique mientras
+#tanto. Las columnas no se copian; sus Datalines van por el journal.
+def snapshot_dataset(ds):
+    snapshot = object.__new__(type(ds))
+    snapshot.__dict__.update(ds.__dict__)
+    snapshot.datalines = []
+    snapshot.fields = list(ds.fields)
+    snapshot.data = [case.copy() for case in ds.data]
+    return snapshot
+
+def same_columns(ds, snapshot):
+    if(len(ds.data) != len(snapshot.data)):
+        return False
+    for (case, saved) in zip(ds.data, snapshot.data):
+        if(case.source is not saved.source or case.columns().keys() != saved.columns().keys()):
+            return False
+        if any(column is not saved.columns()[name] for (name, column) in case.columns().items()):
+            return False
+    return True
+
+#Lo que se escribe de un Dataset que viene de un archivo: la ruta, el tamaño y mtime del archivo y las columnas
+#agregadas despues de importarlo. Las del archivo se vuelven a leer al recuperar, asi un .raw grande no se
+#carga entero en memoria ni se copia al autoguardado.
+class FileDataset():
+    def __init__(self, snapshot):
+        stat = os.stat(snapshot.origin)
+        self.stamp = (stat.st_size, stat.st_mtime_ns)
+        self.state = {name: value for (name, value) in snapshot.__dict__.items() if name != 'data'}
+        self.derived = [{name: column for (name, column) in case.columns().items() if name not in snapshot.file_fields}
+                        for case in snapshot.data]
+
+    #Abre de nuevo el archivo (con las mismas opciones) y le agrega las columnas guardadas
+    def reopen(self):
+        path = self.state['origin']
+        stat = os.stat(path)
+        if((stat.st_size, stat.st_mtime_ns) != self.stamp):
+            raise ValueError(f'{path} changed since it was imported')
+        data = Dataset(filepath=path, lazy=self.state['lazy']).data
+        for (case, columns) in zip(data, self.derived):
+            for (name, column) in columns.items():
+                case[name] = column
+        ds = object.__new__(Dataset)
+        ds.__setstate__(dict(self.state, data=data))
+        return ds
+
+#Lo que se escribe al autoguardado por un Dataset
+def dataset_record(snapshot):
+    if(snapshot.type in FILE_TYPES and snapshot.file_fields is not None and isinstance(snapshot.origin, str)):
+        try:
+            return FileDataset(snapshot)
+        except OSError:
+            pass #El archivo ya no esta: se guardan las columnas que quedaron en memoria
+    return snapshot
+
+class Autosave():
+    def __init__(self, directory=None):
+        directory = AUTOSAVE_DIR if directory is None else directory
+        self.directory = os.path.join(directory, f'session-{os.getpid()}-{id(self)}')
+        os.makedirs(os.path.join(self.directory, 'datasets'), exist_ok=True)
+        self.lock = QLockFile(os.path.join(self.directory, LOCK))
+        self.lock.tryLock(0)
+
+        self.saved = {} #id(Dataset) -> (Dataset, clave, copia guardada)
+        self.recorded = {} #Ultimo valor mandado de cada registro
+        self.keys = itertools.count()
+
+        #Estado del hilo de escritura
+        self.current = {} #Lo que hay escrito en el journal, para compactarlo
+        self.dropped = set() #Datasets que ya no estan en la sesion
+        self.records = 0
+        self.error = None #Primer error del hilo de escritura (ver take_error)
+        self.error_reported = False
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    #Anota el estado actual de la sesion. Solo se encolan las partes que cambiaron desde la ultima vez.
+    def record(self, datasets, plots_data, general_config):
+        order = []
+        for ds in datasets:
+            key = self.dataset_key(ds)
+            order.append((key, ds.title))
+            self.put(('datalines', key), [dataline_state(dl) for dl in ds.datalines])
+        self.put('order', order)
+        self.put('plots', plots_data)
+        self.put('config', general_config)
+        for (i, (ds, key, snapshot)) in list(self.saved.items()):
+            if(key not in [k for (k, title) in order]):
+                del self.saved[i]
+                self.recorded.pop(('datalines', key), None)
+
+    def dataset_key(self, ds):
+        entry = self.saved.get(id(ds))
+        if entry is not None and entry[0] is ds and same_columns(ds, entry[2]):
+            return entry[1]
+        key = next(self.keys)
+        snapshot = snapshot_dataset(ds)
+        self.saved[id(ds)] = (ds, key, snapshot)
+        self.jobs.put(('dataset', key, snapshot))
+        return key
+
+    def put(self, name, value):
+        if(self.recorded.get(name) != value):
+            self.recorded[name] = value
+            self.jobs.put(('record', name, value))
+
+    #El error del hilo de escritura para avisarlo, solo la primera vez que se pide
+    def take_error(self):
+        if(self.error is None or self.error_reported):
+            return None
+        self.error_reported = True
+        return self.error
+
+    #Espera a que se termine de escribir todo lo encolado
+    def flush(self):
+        self.jobs.join()
+
+    #Cierre normal: ya no hace falta recuperar nada
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join()
+        self.lock.unlock()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def dataset_path(self, key):
+        return os.path.join(self.directory, 'datasets', f'{key}.pkl')
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                if(job[0] == 'dataset'):
+                    self.write_dataset(job[1], job[2])
+                else:
+                    self.append(job[1], job[2])
+            except Exception as e:
+                #Si no se puede guardar se sigue sin autoguardado
+                if self.error is None:
+                    self.error = e
+            finally:
+                self.jobs.task_done()
+
+    def write_dataset(self, key, snapshot):
+        path = self.dataset_path(key)
+        with open(f'{path}.tmp', 'wb') as f:
+            pickle.dump(dataset_record(snapshot), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.tmp', path)
+
+    def append(self, name, value):
+        if(name == 'order' and 'order' in self.current):
+            self.dropped |= set(key for (key, title) in self.current['order']) - set(key for (key, title) in value)
+        self.current[name] = value
+        with open(os.path.join(self.directory, JOURNAL), 'ab') as f:
+            pickle.dump((name, value), f, pickle.HIGHEST_PROTOCOL)
+        self.records += 1
+        if(self.records >= COMPACT_RECORDS):
+            self.compact()
+
+    #Reescribe el journal con un registro por cosa y borra los Datasets que ya no se usan
+    def compact(self):
+        for key in self.dropped:
+            self.current.pop(('datalines', key), None)
+            if os.path.exists(self.dataset_path(key)):
+                os.remove(self.dataset_path(key))
+        self.dropped = set()
+        path = os.path.join(self.directory, JOURNAL)
+        with open(f'{path}.tmp', 'wb') as f:
+            for record in self.current.items():
+                pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.tmp', path)
+        self.records = len(self.current)
+
+#Sesiones que quedaron sin cerrar (su lock se puede tomar porque el proceso que lo tenia ya no existe),
+#de la mas nueva a la mas vieja
+def crashed_sessions(directory=None):
+    directory = AUTOSAVE_DIR if directory is None else directory
+    sessions = []
+    for session in glob.glob(os.path.join(directory, 'session-*')):
+        lock = QLockFile(os.path.join(session, LOCK))
+        if lock.tryLock(0):
+            lock.unlock()
+            if os.path.isfile(os.path.join(session, JOURNAL)):
+                sessions.append(session)
+            else:
+                discard_session(session) #No llego a guardar nada
+    return sorted(sessions, key=lambda session: os.path.getmtime(os.path.join(session, JOURNAL)), reverse=True)
+
+#Rearma una sesion desde su journal: (datasets, plots_data, general_config), igual que un .fto, y los titulos de
+#los Datasets que no se pudieron recuperar porque su archivo ya no esta o cambio.
+#Si el ultimo registro quedo escrito a medias se ignora.
+def load_session(session):
+    current = {}
+    with open(os.path.join(session, JOURNAL), 'rb') as f:
+        while True:
+            try:
+                (name, value) = pickle.load(f)
+            except EOFError:
+                break
+            except (pickle.UnpicklingError, ValueError, TypeError):
+                break
+            current[name] = value
+    datasets = []
+    missing = []
+    for (key, title) in current.get('order', []):
+        with open(os.path.join(session, 'datasets', f'{key}.pkl'), 'rb') as f:
+            ds = pickle.load(f)
+        if isinstance(ds, FileDataset):
+            try:
+                ds = ds.reopen()
+            except Exception:
+                missing.append(title)
+                continue
+        ds.title = title
+        for state in current.get(('datalines', key), []):
+            dl = Dataline(ds)
+            dl.__dict__.update(state)
+            ds.datalines.append(dl)
+        datasets.append(ds)
+    return (datasets, current.get('plots'), current.get('config'), missing)
+
+def discard_session(session):
+    shutil.rmtree(session, ignore_errors=True)
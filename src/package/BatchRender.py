@@ -0,0 +1,82 @@
+import os
+import time
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import src.package.RenderMode as RenderMode
+from src.package.PlotRenderer import PlotRenderer, restore_axes_properties, apply_general_config
+from src.package.FigureExport import SLOT_NAMES, FORMATS, slot_filename
+
+RenderMode.use_interactive('Agg')
+
+MAX_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+#Proyecto abierto en cada proceso, para no cargarlo de nuevo en cada grafico
+_project = (None, None)
+
+#(datasets, datalines, plots_data, general_config) de un .fto, sin crear la ventana
+def load_project(filepath):
+    global _project
+    if _project[0] != filepath:
+        with open(filepath, 'rb') as f:
+            _project = (filepath, pickle.load(f))
+    return _project[1]
+
+def output_path(filepath, slot, outdir, fmt):
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(outdir, f'{stem}_{slot_filename(slot)}.{fmt}')
+
+#Dibuja un grafico de un proyecto igual que la interfaz y lo guarda en cada formato.
+#Devuelve (filepath, slot, archivos, segundos, errores).
+def render_slot(filepath, slot, outdir, formats, size=None, dpi=None, full_resolution=False):
+    start = time.perf_counter()
+    datasets, datalines, plots_data, general_config = load_project(filepath)
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.set_tight_layout(True)
+    ax = fig.add_subplot(111)
+    renderer = PlotRenderer(ax)
+    restore_axes_properties(ax, plots_data[slot])
+    lines = [dl for ds in datasets for dl in ds.datalines if dl.plots == slot]
+    legend, errors = renderer.render(lines)
+    apply_general_config(ax, legend, general_config, fonts=bool(lines))
+    if full_resolution:
+        for (line, (x, y)) in renderer.full_data.items():
+            line.set_data(x, y)
+
+    written = []
+    failed = []
+    for fmt in formats:
+        path = output_path(filepath, slot, outdir, fmt)
+        try:
+            with RenderMode.export_context():
+                fig.savefig(path, format=fmt, backend=RenderMode.export_backend(fmt))
+            written.append(path)
+        except Exception as e:
+            failed.append(f'{fmt}: {e}')
+    if errors:
+        failed.append(f'{len(errors)} datalines with wrong data source matching')
+    return (filepath, slot, written, time.perf_counter() - start, failed)
+
+#Renderiza todos los graficos de los proyectos en paralelo y los va devolviendo a medida que terminan
+def render_projects(filepaths, outdir, formats=['png'], workers=None, size=None, dpi=None, full_resolution=False):
+    os.makedirs(outdir, exist_ok=True)
+    tasks = [(filepath, slot) for filepath in filepaths for slot in range(len(SLOT_NAMES))]
+    workers = min(MAX_WORKERS if workers is None else workers, len(tasks))
+    if(workers < 2):
+        for (filepath, slot) in tasks:
+            try:
+                yield render_slot(filepath, slot, outdir, formats, size, dpi, full_resolution)
+            except Exception as e:
+                yield (filepath, slot, [], 0.0, [repr(e)])
+        return
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(render_slot, filepath, slot, outdir, formats, size, dpi, full_resolution): (filepath, slot) for (filepath, slot) in tasks}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield (*futures[future], [], 0.0, [repr(e)])
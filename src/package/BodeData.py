@@ -0,0 +1,82 @@
+import numpy as np
+from src.package.CaseData import ColumnCache, new_source_token
+import src.package.FrequencyResponse as FrequencyResponse
+
+#Columnas de los Datasets de transferencias y filtros
+BODE_FIELDS = ['f', 'g', 'ph', 'gd']
+
+RESPONSE_CACHE_SIZE = 64 * 2**20
+
+#Al ampliar un rango se recalcula con esta cantidad de puntos por pixel (mas los que agrega la grilla adaptiva)
+RANGE_POINTS_PER_PIXEL = 2
+#El rango pedido se agranda hasta multiplos de (a lo sumo) esta fraccion de su ancho en decadas, asi un pan
+#o zoom chico reusa el mismo calculo
+RANGE_QUANTUM = 1 / 4
+
+#f, g, ph y gd calculados juntos para una grilla
+class BodeResponse():
+    def __init__(self, f, g, ph, gd):
+        self.columns = dict(zip(BODE_FIELDS, (f, g, ph, gd)))
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+#Respuestas ya calculadas, por (transferencia, rango, resolucion)
+RESPONSE_CACHE = ColumnCache(RESPONSE_CACHE_SIZE)
+
+#Bode de (z, p, k) en la grilla adaptiva entera, o en span = (fmin, fmax) Hz con points_per_decade de base.
+#key identifica a la transferencia en el cache. La fase sale igual en cualquier rango (ver zpk_response).
+def bode_response(z, p, k, key, span=None, points_per_decade=None):
+    cache_key = (key, span, points_per_decade)
+    response = RESPONSE_CACHE.get(cache_key)
+    if response is None:
+        if span is None:
+            w = FrequencyResponse.adaptive_grid(z, p, k)
+        else:
+            w = FrequencyResponse.adaptive_grid(z, p, k, (2 * np.pi * span[0], 2 * np.pi * span[1]), points_per_decade)
+        g, ph, gd = FrequencyResponse.zpk_response(z, p, k, w, reference=FrequencyResponse.grid_span(z, p)[0])
+        response = BodeResponse(w / (2 * np.pi), g, ph, gd)
+        RESPONSE_CACHE.put(cache_key, response)
+    return response
+
+#(span, points_per_decade) a calcular para ver [lo, hi] Hz en pixels de ancho, o None si el rango no sirve
+def range_request(lo, hi, pixels):
+    if not(0 < lo < hi):
+        return None
+    (a, b) = (np.log10(lo), np.log10(hi))
+    quantum = 2.0**np.floor(np.log2((b - a) * RANGE_QUANTUM))
+    points_per_decade = 2**int(np.ceil(np.log2(max(1, RANGE_POINTS_PER_PIXEL * pixels / (b - a)))))
+    (a, b) = (np.floor(a / quantum) * quantum, np.ceil(b / quantum) * quantum)
+    return ((10**a, 10**b), points_per_decade)
+
+#Fuente de columnas (como RawFile) de un Dataset de transferencia: nada se calcula hasta que se pide una columna.
+#Guarda una copia de los ceros, polos y ganancia, porque el TFunction original se puede seguir modificando.
+class BodeSource():
+    def __init__(self, tf):
+        (z, p, k) = tf.getZPK()
+        self.z = np.array(z, dtype=np.complex128).ravel()
+        self.p = np.array(p, dtype=np.complex128).ravel()
+        self.k = complex(k) if np.iscomplexobj(k) else float(k)
+        self.key = (self.z.tobytes(), self.p.tobytes(), self.k)
+        self.token = new_source_token()
+        self.variables = list(BODE_FIELDS)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['token']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.token = new_source_token()
+
+    def read_column(self, name, case=0):
+        return bode_response(self.z, self.p, self.k, self.key).columns[name]
+
+    #Columnas recalculadas para ver [lo, hi] Hz con mas detalle, o None
+    def range_columns(self, lo, hi, pixels):
+        request = range_request(lo, hi, pixels)
+        if request is None:
+            return None
+        return bode_response(self.z, self.p, self.k, self.key, *request).columns
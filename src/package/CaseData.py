@@ -0,0 +1,104 @@
+import itertools
+import numpy as np
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from src.package.LinearAxis import LinearAxis
+
+COLUMN_CACHE_SIZE = 512 * 2**20
+
+_source_tokens = itertools.count()
+
+#Cada fuente de columnas (RawFile, TxtFile) pide un token para identificar sus columnas en el cache
+def new_source_token():
+    return next(_source_tokens)
+
+#Bytes en memoria de una columna: las vistas sobre un archivo mapeado no ocupan memoria propia
+def resident_bytes(column):
+    return 0 if isinstance(column, np.memmap) else column.nbytes
+
+#LRU acotado en bytes para las columnas decodificadas de las fuentes perezosas
+class ColumnCache():
+    def __init__(self, max_bytes=COLUMN_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._columns = OrderedDict()
+
+    def get(self, key):
+        column = self._columns.get(key)
+        if column is not None:
+            self._columns.move_to_end(key)
+        return column
+
+    def put(self, key, column):
+        if key in self._columns:
+            self.nbytes -= resident_bytes(self._columns.pop(key))
+        self._columns[key] = column
+        self.nbytes += resident_bytes(column)
+        while self.nbytes > self.max_bytes and len(self._columns) > 1:
+            _, evicted = self._columns.popitem(last=False)
+            self.nbytes -= resident_bytes(evicted)
+
+    def clear(self):
+        self._columns.clear()
+        self.nbytes = 0
+
+COLUMN_CACHE = ColumnCache()
+
+#Almacenamiento columnar de un caso de un Dataset: cada campo es un array de NumPy contiguo y tipado.
+#Se usa como un dict (data[case][field]) para no romper el resto del programa. Opcionalmente las columnas
+#vienen de una fuente externa (RawFile, TxtFile) que solo las decodifica la primera vez que se piden,
+#y quedan guardadas en COLUMN_CACHE. Los ejes con muestreo uniforme se guardan como LinearAxis, sin muestras.
+class CaseData(MutableMapping):
+    def __init__(self, columns=None, source=None, case=0):
+        self.source = source
+        self.case = case
+        self._columns = {}
+        if columns is not None:
+            for (name, value) in columns.items():
+                self[name] = value
+
+    #Un bloque 2-D (campos x muestras) por caso; cada columna es una fila del bloque, sin copiar
+    @classmethod
+    def from_block(cls, fields, block):
+        casedata = cls()
+        block = np.ascontiguousarray(block)
+        for (x, name) in enumerate(fields):
+            casedata._columns[name] = block[x]
+        return casedata
+
+    #Columnas propias, sin las de la fuente
+    def columns(self):
+        return self._columns
+
+    def copy(self):
+        casedata = CaseData(source=self.source, case=self.case)
+        casedata._columns = dict(self._columns)
+        return casedata
+
+    def source_fields(self):
+        return self.source.variables if self.source is not None else []
+
+    def __getitem__(self, name):
+        if name in self._columns:
+            return self._columns[name]
+        if name in self.source_fields():
+            key = (self.source.token, self.case, name)
+            column = COLUMN_CACHE.get(key)
+            if column is None:
+                column = self.source.read_column(name, self.case)
+                COLUMN_CACHE.put(key, column)
+            return column
+        raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        self._columns[name] = value if isinstance(value, LinearAxis) else np.ascontiguousarray(value)
+
+    def __delitem__(self, name):
+        del self._columns[name]
+
+    def __iter__(self):
+        yield from self.source_fields()
+        yield from (name for name in self._columns if name not in self.source_fields())
+
+    def __len__(self):
+        return len(self.source_fields()) + len([name for name in self._columns if name not in self.source_fields()])
@@ -0,0 +1,142 @@
+import csv
+import itertools
+import os
+import numpy as np
+
+CHUNK_ROWS = 65536
+SAMPLE_ROWS = 64
+
+#Lee un CSV en una sola pasada, de a bloques de filas, llenando columnas de NumPy preasignadas.
+#Respeta las reglas del parser original: se saltean las lineas de comentario ('#' o de menos de 3 caracteres),
+#una celda vacia corta todas las columnas al largo de esa columna, y las celdas que no se pueden convertir se ignoran.
+#progress(bytes_leidos, bytes_totales, filas) se llama despues de cada bloque; para cancelar, que levante una excepcion.
+class CsvReader():
+    def __init__(self, filepath, chunk_rows=CHUNK_ROWS, progress=None):
+        self.filepath = filepath
+        self.chunk_rows = chunk_rows
+        self.progress = progress
+        self.fields = []
+        self.columns = {}
+        self.lengths = {}
+        self._index = {}
+
+    def read(self):
+        filesize = os.path.getsize(self.filepath)
+        with open(self.filepath, mode='r', newline='') as csv_file:
+            i = 0
+            for line in csv_file:
+                if line[0] == '#' or len(line.strip('\r\n')) < 2:
+                    i += len(line)
+                else:
+                    break
+            csv_file.seek(i) #Salteo los comentario y me paro donde esta lo que importa
+            headerline = csv_file.readline()
+            try:
+                header = next(csv.reader([headerline]))
+            except StopIteration:
+                return {}
+            self.fields = list(dict.fromkeys(header))
+            self._index = {field: x for (x, field) in enumerate(header)}
+
+            lines = self.next_chunk(csv_file, SAMPLE_ROWS)
+            self.allocate(lines, filesize - i - len(headerline))
+            done = i + len(headerline)
+            while lines:
+                self.append_chunk(lines)
+                done += sum(len(line) for line in lines)
+                if self.progress:
+                    self.progress(min(done, filesize), filesize, max(self.lengths.values(), default=0))
+                lines = self.next_chunk(csv_file, self.chunk_rows)
+
+        for field in self.fields:
+            self.columns[field].resize(self.lengths[field], refcheck=False)
+        return self.columns
+
+    def next_chunk(self, csv_file, n):
+        return [line for line in itertools.islice(csv_file, n) if line.strip('\r\n') != '']
+
+    def allocate(self, sample, remaining_bytes):
+        rowbytes = max(1, sum(len(line) for line in sample) / max(1, len(sample)))
+        capacity = int(remaining_bytes / rowbytes * 1.05) + len(sample) + 16
+        rows = list(csv.reader(sample))
+        for field in self.fields:
+            self.columns[field] = np.empty(capacity, dtype=self.infer_dtype(field, rows))
+            self.lengths[field] = 0
+
+    def infer_dtype(self, field, sample):
+        x = self._index[field]
+        for row in sample:
+            if x < len(row) and ('i' in row[x] or 'j' in row[x]):
+                try:
+                    np.complex128(row[x])
+                    return np.complex128
+                except ValueError:
+                    pass
+        return np.float64
+
+    def reserve(self, field, n, dtype=np.float64):
+        column = self.columns[field]
+        if np.issubdtype(dtype, np.complexfloating) and not np.iscomplexobj(column):
+            column = column.astype(np.complex128)
+        needed = self.lengths[field] + n
+        if needed > len(column):
+            grown = np.empty(max(needed, 2 * len(column)), dtype=column.dtype)
+            grown[:self.lengths[field]] = column[:self.lengths[field]]
+            column = grown
+        self.columns[field] = column
+        return column
+
+    def append_chunk(self, lines):
+        values = self.convert_chunk(lines)
+        if values is None:
+            for row in csv.reader(lines):
+                if row != []:
+                    self.append_row(row)
+            return
+        for (field, column) in values.items():
+            start = self.lengths[field]
+            self.reserve(field, len(column), column.dtype)[start:start + len(column)] = column
+            self.lengths[field] = start + len(column)
+
+    #Camino rapido: todas las filas con la misma cantidad de celdas y todas numericas, se convierte el bloque entero.
+    #Si algo no cumple devuelve None y el bloque se procesa fila por fila con las reglas originales.
+    def convert_chunk(self, lines):
+        complex_chunk = any(np.iscomplexobj(self.columns[field]) for field in self.fields)
+        try:
+            cells = np.loadtxt(lines, delimiter=',', comments=None, ndmin=2,
+                               dtype=np.complex128 if complex_chunk else np.float64)
+        except ValueError:
+            return None
+        values = {}
+        for field in self.fields:
+            x = self._index[field]
+            if x >= cells.shape[1]:
+                continue #Celdas faltantes: se ignoran, igual que un None de DictReader
+            column = cells[:, x]
+            if np.iscomplexobj(column) and not np.iscomplexobj(self.columns[field]) and not np.any(column.imag):
+                column = column.real
+            if not np.iscomplexobj(column) and np.any(np.isinf(column)):
+                column = column.astype(np.complex128)
+            values[field] = column
+        return values
+
+    def append_row(self, row):
+        for field in self.fields:
+            x = self._index[field]
+            if x >= len(row):
+                continue
+            val = row[x]
+            try:
+                if('i' in val or 'j' in val):
+                    value = np.complex128(val)
+                elif(val != ''):
+                    value = float(val)
+                else:
+                    maxlen = self.lengths[field]
+                    for field2 in self.fields:
+                        self.lengths[field2] = min(self.lengths[field2], maxlen)
+                    break
+            except(ValueError):
+                continue
+            self.reserve(field, 1, np.complex128 if isinstance(value, complex) else np.float64)[self.lengths[field]] = value
+            self.lengths[field] += 1
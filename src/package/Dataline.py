@@ -1,4 +1,5 @@
 from collections import defaultdict
+from src.package.Decimation import DEFAULT_DECIMATION
 
 class Dataline():
     def __init__(self, dataset, name='', casenum=0, color='#CDCDCD', xsource='', ysource=''):
@@ -18,5 +19,12 @@ class Dataline():
         self.markersize = 4
         self.savgolwindow = 1
         self.savgolord = 0
+        self.decimation = DEFAULT_DECIMATION
+        self.dirty = True #Hay que redibujarlo (ver RedrawScheduler)
         self.casenum = casenum
-        self.dataset = dataset
\ No newline at end of file
+        self.dataset = dataset
+
+    #Los .fto guardados con versiones anteriores no tienen todos los campos, esos quedan con el valor por defecto
+    def __setstate__(self, state):
+        self.__init__(state.get('dataset'))
+        self.__dict__.update(state)
\ No newline at end of file
@@ -1,16 +1,28 @@
 from unicodedata import name
+import os
 import ltspice
-import matplotlib.pyplot as plt
 import numpy as np
-import csv
 from src.package.transfer_function import TFunction
 from src.package.Filter import AnalogFilter
-from collections import defaultdict
+from src.package.CsvReader import CsvReader
+from src.package.RawFile import RawFile
+from src.package.TxtFile import TxtFile
+from src.package.CaseData import CaseData
+from src.package.BodeData import BodeSource
+from src.package.LinearAxis import LinearAxis
+import src.package.ParseCache as ParseCache
 from PyQt5.QtCore import QFileInfo
 from src.package.Dataline import Dataline
 
+#Con LAZY_LOAD los .raw y .txt solo se indexan al importarlos, y cada columna se decodifica
+#la primera vez que algun Dataline la usa (ver CaseData.COLUMN_CACHE)
+LAZY_LOAD = True
+
+#Los parsers de archivos avisan su avance con progress(bytes_leidos, bytes_totales, filas).
+#Para cancelar una importacion, el callback levanta una excepcion y el Dataset no se termina de crear.
+
 class Dataset:
-    def __init__(self, filepath='', title='', origin=''):
+    def __init__(self, filepath='', title='', origin='', lazy=LAZY_LOAD, progress=None):
         qfi = QFileInfo(filepath)
 
         self.color = 0
@@ -30,17 +42,19 @@ class Dataset:
         self.suggestedYscale = 1
         self.suggestedXsource = ''
         self.suggestedYsource = ''
+        self.lazy = lazy
+        self.dirty = False #Cambiaron las columnas y hay que recalcular sus lineas (ver RedrawScheduler)
 
         extension = qfi.suffix()
         if(extension == 'raw'):
             self.type = 'spice'
-            self.parse_from_spice(filepath)
+            self.parse_from_spice(filepath, progress)
         elif(extension == 'csv'):
             self.type = 'csv'
-            self.parse_from_csv(filepath)
+            self.parse_from_csv(filepath, progress)
         elif(extension == 'txt'):
             self.type = 'txt'
-            self.parse_from_txt(filepath)
+            self.parse_from_txt(filepath, progress)
         elif(filepath == ''):
             if isinstance(self.origin, AnalogFilter):
                 self.tf = self.origin.tf
@@ -55,14 +69,45 @@ class Dataset:
         
         for field in self.data[0]:
             self.fields.append(field)
+        #Campos que salen del archivo; los que se agreguen despues no (ver Autosave.FileDataset)
+        self.file_fields = list(self.fields) if filepath != '' else None
         
-    def parse_from_spice(self, filepath):
+    #Los .fto guardados con versiones anteriores no tienen todos los campos
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('lazy', LAZY_LOAD)
+        self.__dict__.setdefault('dirty', False)
+        self.__dict__.setdefault('file_fields', None)
+        #Antes los casos eran dicts de listas
+        self.data = [case if isinstance(case, CaseData) else CaseData(case) for case in self.data]
+
+    def parse_from_spice(self, filepath, progress=None):
+        raw = RawFile(filepath)
+        if(raw.filetype == 'Binary'):
+            self.miscinfo += f'Spice simulation, MODE: {raw.mode}'
+            size = os.path.getsize(filepath)
+            if(self.lazy):
+                self.data = [CaseData(source=raw, case=i) for i in range(raw.case_count)]
+            else:
+                self.data = []
+                rows = 0
+                for i in range(raw.case_count):
+                    self.data.append(CaseData({name: raw.read_column(name, i) for name in raw.variables}))
+                    rows += len(self.data[i][raw.variables[0]])
+                    if progress:
+                        progress(size * (i + 1) // raw.case_count, size, rows)
+            if progress:
+                progress(size, size, raw.points)
+            return
+        #Los .raw en ASCII se siguen leyendo con la libreria ltspice
+        if ParseCache.load(self, filepath, progress):
+            return
         l = ltspice.Ltspice(filepath)
         l.parse()
         self.data = []
         self.miscinfo += f'Spice simulation, MODE: {l._mode}'
         for i in range(l.case_count):
-            self.data.append(defaultdict(list))
+            self.data.append(CaseData())
             for varname in l.variables:
                 vardata = []
                 if(varname == 'time'):
@@ -72,115 +117,99 @@ class Dataset:
                 else:
                     vardata = l.get_data(name=varname, case=i)
                 self.data[i][varname] = vardata
+        ParseCache.store(self, filepath)
 
-    def parse_from_txt(self, filepath):
-        with open(filepath, mode='r') as file:
-            fields = file.readline().replace('\n', '').split('\t')
-            case = -1
-            for line in file.readlines():
-                if('Step Information:' in line):
-                    self.data.append(defaultdict(list))
-                    self.casenames.append(line[18:line.index('  (Run: ')])
-                    case += 1
-                else:
-                    linedata = line.replace('\n', '').split('\t')
-                    for x in range(len(fields)):
-                        if('i' in linedata[x]):
-                            self.data[case][fields[x]].append(np.complex128(linedata[x]))
-                        else:
-                            self.data[case][fields[x]].append(float(linedata[x]))
-
-    def parse_from_csv(self, filepath):
-        with open(filepath, mode='r') as csv_file:
-            i = 0
-            for line in csv_file:
-                if line[0] == '#' or len(line) < 3:
-                    i += len(line)
-                else:
-                    break
-            csv_file.seek(i) #Salteo los comentario y me paro donde esta lo que importa
-            csv_reader = csv.DictReader(csv_file)
-            self.data = [{}]
-            first_row = next(csv_reader)
-            for (field, val) in first_row.items():
-                self.data[0][field] = []
-
-            csv_file.seek(i)
-            csv_reader = csv.DictReader(csv_file)
+    #Con el cache de parseo activo el .txt se parsea entero la primera vez, y despues las columnas se mapean desde el cache
+    def parse_from_txt(self, filepath, progress=None):
+        if ParseCache.load(self, filepath, progress):
+            return
+        txt = TxtFile(filepath)
+        self.casenames = txt.casenames
+        size = os.path.getsize(filepath)
+        if(self.lazy and not ParseCache.PARSE_CACHE):
+            self.data = [CaseData(source=txt, case=i) for i in range(txt.case_count)]
+            if progress:
+                progress(size, size, 0)
+            return
+        self.data = []
+        rows = 0
+        for i in range(txt.case_count):
+            block = txt.read_block(i)
+            self.data.append(CaseData.from_block(txt.variables, block))
+            rows += block.shape[1]
+            if progress:
+                progress(txt._blocks[i][1], size, rows)
+        ParseCache.store(self, filepath)
 
-            for row in csv_reader:
-                for (field, val) in row.items():
-                    try:
-                        if('i' in val or 'j' in val):
-                            self.data[0][field].append(np.complex128(val))
-                        elif(val != ''):
-                            self.data[0][field].append(float(val))
-                        else:
-                            maxlen = len(self.data[0][field])
-                            for (field2, val2) in row.items():
-                                self.data[0][field2] = self.data[0][field2][:maxlen]
-                            break
-                    except(ValueError):
-                        pass
-                    except(TypeError):
-                        pass
-                    except(KeyError):
-                        pass
-                    
-            if('rigol' in filepath.lower()):
-                self.miscinfo += ('- taken from Rigol DSO')
-                self.suggestedXscale = float(self.data[0]['Increment'][0])
-                if('' in self.data[0]):
-                    self.data[0].pop('')
-                self.data[0].pop('Increment')
-                self.data[0].pop('Start')
-                self.suggestedXsource = 'X'
-                for chnum in ['CH4', 'CH3', 'CH2', 'CH1']:
-                    if(chnum in self.data[0]):
-                        self.suggestedYsource = chnum
-            elif('agilent' in filepath.lower()):
-                self.miscinfo += ('- taken from Agilent DSO')
-                self.suggestedXsource = 'x-axis'
-                for chnum in ['4', '3', '2', '1']:
-                    if(chnum in self.data[0]):
-                        self.suggestedYsource = chnum
-            csv_file.close()
+    def parse_from_csv(self, filepath, progress=None):
+        if ParseCache.load(self, filepath, progress):
+            return
+        self.data = [CaseData(CsvReader(filepath, progress=progress).read())]
+        if(len(self.data[0]) == 0):
+            raise ValueError
+        if('rigol' in filepath.lower()):
+            self.miscinfo += ('- taken from Rigol DSO')
+            self.suggestedXscale = float(self.data[0]['Increment'][0])
+            if('' in self.data[0]):
+                self.data[0].pop('')
+            self.data[0].pop('Increment')
+            self.data[0].pop('Start')
+            self.suggestedXsource = 'X'
+            for chnum in ['CH4', 'CH3', 'CH2', 'CH1']:
+                if(chnum in self.data[0]):
+                    self.suggestedYsource = chnum
+        elif('agilent' in filepath.lower()):
+            self.miscinfo += ('- taken from Agilent DSO')
+            self.suggestedXsource = 'x-axis'
+            for chnum in ['4', '3', '2', '1']:
+                if(chnum in self.data[0]):
+                    self.suggestedYsource = chnum
+        #Los osciloscopios muestrean uniforme: el eje se reemplaza por uno implicito y no se guardan las muestras
+        if(self.suggestedXsource in self.data[0]):
+            axis = LinearAxis.from_samples(self.data[0][self.suggestedXsource])
+            if axis is not None:
+                self.data[0][self.suggestedXsource] = axis
+        ParseCache.store(self, filepath)
 
+    #f, g, ph y gd se calculan recien cuando algun Dataline los usa (ver BodeData.BodeSource)
     def parse_from_expression(self):
-        f, g, ph, gd = self.tf.getBode()
         z, p = self.tf.getZP()
-        self.data = [{}]
+        self.data = [CaseData(source=BodeSource(self.tf))]
         self.zeros = [{}]
         self.poles = [{}]
-        self.data[0]['f'] = f
-        self.data[0]['g'] = g
-        self.data[0]['ph'] = ph
-        self.data[0]['gd'] = gd
         self.zeros[0] = z
         self.poles[0] = p
         self.suggestedXsource = 'f'
         self.suggestedYsource = 'g'
     
     def parse_from_filter(self):
-        f, g, ph, gd = self.tf.getBode()
         z, p = self.tf.getZP()
-        self.data = [{}]
+        self.data = [CaseData(source=BodeSource(self.tf))]
         self.zeros = [{}]
         self.poles = [{}]
-        self.data[0]['f'] = f
-        self.data[0]['g'] = g
-        self.data[0]['ph'] = ph
-        self.data[0]['gd'] = gd
         self.zeros[0] = z
         self.poles[0] = p
         self.suggestedXsource = 'f'
         self.suggestedYsource = 'g'
             
+    #Devuelve vistas de las columnas, no copias
     def get_datapoints(self, xvar_name='time', yvar_name='v', case=0):
         xdata = np.real(self.data[case][xvar_name])
-        ydata = np.array(self.data[case][yvar_name])
+        ydata = self.data[case][yvar_name]
         return (xdata, ydata)
 
+    #(x, y) recalculados para ver x en [lo, hi] con pixels de ancho, si la fuente de las columnas puede
+    #(BodeSource con x = 'f'); si no, None y se usan las columnas de siempre
+    def get_datapoints_range(self, xvar_name, yvar_name, case, lo, hi, pixels):
+        casedata = self.data[case]
+        source = getattr(casedata, 'source', None)
+        if not hasattr(source, 'range_columns') or xvar_name != 'f':
+            return None
+        if(yvar_name not in source.variables or any(name in casedata.columns() for name in (xvar_name, yvar_name))):
+            return None
+        columns = source.range_columns(lo, hi, pixels)
+        return None if columns is None else (columns[xvar_name], columns[yvar_name])
+
     def create_dataline(self, casenum=0):
         name = f'{self.title} {len(self.datalines) + 1}'
         dl = Dataline(self, name=name, casenum=casenum, color='#303030', xsource=self.suggestedXsource, ysource=self.suggestedYsource)
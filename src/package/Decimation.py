@@ -0,0 +1,115 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+#Indices del combo de diezmado de cada Dataline
+DECIMATION_NONE = 0
+DECIMATION_M4 = 1
+DECIMATION_LTTB = 2
+DEFAULT_DECIMATION = DECIMATION_M4
+
+#Con menos de POINTS_PER_PIXEL muestras por pixel no vale la pena diezmar
+POINTS_PER_PIXEL = 4
+MIN_PIXELS = 100
+
+def is_increasing(x):
+    if hasattr(x, 'step'):
+        return x.step > 0
+    return len(x) < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+#Limites [start, end) de las muestras que caen en cada columna de pixeles, entre x[0] y x[-1]
+def pixel_bins(x, pixels, log=False):
+    (lo, hi) = (x[0], x[-1])
+    if(log and lo > 0):
+        edges = np.logspace(np.log10(lo), np.log10(hi), pixels + 1)
+    else:
+        edges = np.linspace(lo, hi, pixels + 1)
+    bounds = np.concatenate(([0], x.searchsorted(edges[1:-1], side='left'), [len(x)]))
+    starts = bounds[:-1]
+    ends = bounds[1:]
+    keep = ends > starts
+    return (starts[keep], ends[keep])
+
+#Columna de pixeles (indice en starts) de cada muestra entre starts[0] y ends[-1]
+def sample_bins(starts, ends):
+    return np.repeat(np.arange(len(starts)), ends - starts)
+
+#Indices de la minima y la maxima muestra de cada columna. Las columnas del mismo largo se reducen juntas
+#como filas de una matriz de ventanas sobre y, asi hay una llamada por largo distinto y no una por columna.
+def bin_extremes(y, starts, ends):
+    lengths = ends - starts
+    (imin, imax) = (np.empty(len(starts), dtype=np.intp), np.empty(len(starts), dtype=np.intp))
+    for length in np.unique(lengths):
+        same = np.flatnonzero(lengths == length)
+        if(np.all(np.diff(starts[same]) == length)):
+            first = starts[same[0]]
+            windows = y[first:first + len(same) * length].reshape(len(same), length) #Columnas seguidas, sin copiar
+        else:
+            windows = sliding_window_view(y, length)[starts[same]]
+        imin[same] = starts[same] + np.argmin(windows, axis=1)
+        imax[same] = starts[same] + np.argmax(windows, axis=1)
+    return (imin, imax)
+
+#M4: de cada columna de pixeles se quedan la primera, la ultima, la minima y la maxima muestra.
+#Dibujado con lineas queda igual pixel a pixel que la traza completa, picos y glitches incluidos.
+def m4(x, y, pixels, log=False):
+    (starts, ends) = pixel_bins(x, pixels, log)
+    (imin, imax) = bin_extremes(y, starts, ends)
+    index = np.unique(np.concatenate((starts, ends - 1, imin, imax)).astype(np.intp))
+    return (x[index], y[index])
+
+#Para lineas solo de marcadores M4 no sirve (se pierden los puntos del medio de cada columna): de cada pixel
+#(columna x fila, con height filas entre el minimo y el maximo de y) ocupado se queda una muestra, asi los
+#marcadores pintan los mismos pixeles que la traza completa.
+def occupancy(x, y, pixels, height, log=False, ylog=False):
+    (starts, ends) = pixel_bins(x, pixels, log)
+    values = np.real(y).astype(np.float64)
+    if ylog:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.log10(np.where(values > 0, values, np.nan))
+    finite = np.flatnonzero(np.isfinite(values))
+    if(len(finite) == 0):
+        return (x, y)
+    values = values[finite]
+    (lo, hi) = (values.min(), values.max())
+    rows = max(int(height), 1)
+    row = np.zeros(len(values), dtype=np.intp) if hi == lo else np.minimum(((values - lo) * (rows / (hi - lo))).astype(np.intp), rows - 1)
+    #Cualquier muestra de la celda sirve: se queda la ultima que se escribe en cada una
+    owner = np.full(len(starts) * rows, -1, dtype=np.intp)
+    owner[sample_bins(starts, ends)[finite] * rows + row] = finite
+    index = np.sort(owner[owner >= 0])
+    return (x[index], y[index])
+
+#Largest-Triangle-Three-Buckets: n puntos que conservan la forma de la curva, con el primero y el ultimo fijos
+def lttb(x, y, n):
+    xs = np.asarray(x, dtype=np.float64)
+    bounds = np.linspace(1, len(y) - 1, n - 1).astype(np.intp)
+    index = np.empty(n, dtype=np.intp)
+    index[0] = 0
+    index[-1] = len(y) - 1
+    for i in range(n - 2):
+        (a, b) = (bounds[i], bounds[i + 1])
+        (c, d) = (bounds[i + 1], bounds[i + 2]) if i + 2 < n - 1 else (len(y) - 1, len(y))
+        (px, py) = (xs[index[i]], y[index[i]])
+        (nx, ny) = (xs[c:d].mean(), y[c:d].mean())
+        area = np.abs((px - nx) * (y[a:b] - py) - (px - xs[a:b]) * (ny - py))
+        index[i + 1] = a + np.argmax(area)
+    return (x[index], y[index])
+
+#Reduce una linea a unos pocos puntos por pixel de ancho del grafico. Solo diezmo si x es creciente
+#(o decreciente, dandolo vuelta); en curvas parametricas se devuelve todo.
+#Si la linea es solo de marcadores se pasa el alto del grafico en pixeles (height) y se usa occupancy.
+def decimate(x, y, method=DEFAULT_DECIMATION, pixels=MIN_PIXELS, log=False, height=None, ylog=False):
+    pixels = max(int(pixels), MIN_PIXELS)
+    if(method == DECIMATION_NONE or len(y) != len(x) or len(y) <= POINTS_PER_PIXEL * pixels):
+        return (x, y)
+    y = np.asarray(y)
+    if not is_increasing(x):
+        if not is_increasing(x[::-1]):
+            return (x, y)
+        (x, y) = decimate(x[::-1], y[::-1], method, pixels, log, height, ylog)
+        return (x[::-1], y[::-1])
+    if height is not None:
+        return occupancy(x, y, pixels, height, log, ylog)
+    if(method == DECIMATION_LTTB):
+        return lttb(x, y, 2 * pixels)
+    return m4(x, y, pixels, log)
@@ -0,0 +1,168 @@
+import gc
+import os
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+import src.package.RenderMode as RenderMode
+from src.package.PlotRenderer import ANGLE_TRANSFORMS, axes_properties, restore_axes_properties, apply_general_config, y_locator
+
+#Graficos de la interfaz, en el orden de Dataline.plots y de los plots_data de un .fto
+SLOT_NAMES = ['Plot 1', 'Plot 2.1', 'Plot 2.2', 'Plot 3', 'Plot 4.1', 'Plot 4.2', 'Plot 5']
+FORMATS = ['png', 'pdf', 'pgf']
+MAX_WORKERS = max(1, min(len(SLOT_NAMES), (os.cpu_count() or 1) - 1))
+POLL_INTERVAL = 0.1
+
+#Los arrays mas chicos que esto se mandan a los procesos serializados, los demas por memoria compartida
+SHARED_MIN_BYTES = 2**20
+
+def slot_filename(slot):
+    return SLOT_NAMES[slot].lower().replace(' ', '_').replace('.', '_')
+
+#Referencia a un array copiado en memoria compartida; es lo unico que viaja al proceso que exporta
+class SharedArray():
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    #Devuelve (bloque, array); el bloque hay que cerrarlo cuando ya no se usa el array
+    def attach(self):
+        #Los procesos del pool comparten el resource_tracker del que creo el bloque, que es quien lo borra
+        block = shared_memory.SharedMemory(name=self.name)
+        return (block, np.ndarray(self.shape, dtype=self.dtype, buffer=block.buf))
+
+#Bloques de memoria compartida de una exportacion. Se liberan con close() cuando terminan todos los procesos.
+class SharedArrays():
+    def __init__(self):
+        self.blocks = []
+
+    def share(self, values):
+        if not isinstance(values, np.ndarray) or values.nbytes < SHARED_MIN_BYTES:
+            return values
+        block = shared_memory.SharedMemory(create=True, size=values.nbytes)
+        self.blocks.append(block)
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        return SharedArray(block.name, values.shape, values.dtype.str)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+#Copia liviana de un grafico para dibujarlo en otro proceso: propiedades del Axes, estilo y datos de cada linea.
+#Los datos grandes quedan en shared; las lineas diezmadas van con todas sus muestras si full_resolution.
+def snapshot_canvas(canvas, slot, general_config, shared, full_resolution=False):
+    renderer = canvas.plot_renderer
+    full_data = renderer.full_data if full_resolution else {}
+    lines = []
+    for (dl, r) in sorted(renderer.rendered.items(), key=lambda item: item[1].line.get_zorder()):
+        line = r.line
+        (x, y) = full_data.get(line) or line.get_data(orig=True)
+        lines.append({
+            'x': shared.share(x),
+            'y': shared.share(y),
+            'style': {
+                'label': line.get_label(),
+                'color': line.get_color(),
+                'linestyle': line.get_linestyle(),
+                'linewidth': line.get_linewidth(),
+                'marker': line.get_marker(),
+                'markersize': line.get_markersize(),
+                'zorder': line.get_zorder(),
+                'visible': line.get_visible(),
+            },
+            'legend': line.get_label() != '' and line.get_label()[0] != '_' and not r.error,
+            'angle': dl.transform in ANGLE_TRANSFORMS,
+        })
+    fig = canvas.figure
+    return {
+        'slot': slot,
+        'size': tuple(fig.get_size_inches()),
+        'dpi': fig.dpi / canvas.device_pixel_ratio,
+        'axes': axes_properties(canvas.ax),
+        'config': general_config,
+        'lines': lines,
+    }
+
+#En el proceso que exporta: arma la figura del snapshot y la guarda en cada formato.
+#Devuelve (slot, [(archivo, segundos, error o None)]).
+def render_snapshot(snapshot, basepath, formats):
+    blocks = []
+    try:
+        return (snapshot['slot'], draw_snapshot(snapshot, basepath, formats, blocks))
+    finally:
+        gc.collect() #Que la figura suelte los arrays antes de cerrar los bloques
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass #Algun array sigue vivo; el bloque se cierra al terminar el proceso
+
+def draw_snapshot(snapshot, basepath, formats, blocks):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    RenderMode.use_interactive('Agg')
+    fig = Figure(figsize=snapshot['size'], dpi=snapshot['dpi'])
+    FigureCanvasAgg(fig)
+    fig.set_tight_layout(True)
+    ax = fig.add_subplot(111)
+    legend = []
+    for line in snapshot['lines']:
+        (x, y) = (line['x'], line['y'])
+        if isinstance(x, SharedArray):
+            (block, x) = x.attach()
+            blocks.append(block)
+        if isinstance(y, SharedArray):
+            (block, y) = y.attach()
+            blocks.append(block)
+        (artist,) = ax.plot(x, y, **line['style'])
+        if line['legend']:
+            legend.append(artist)
+    if snapshot['lines']:
+        ax.yaxis.set_major_locator(y_locator(snapshot['lines'][-1]['angle']))
+    restore_axes_properties(ax, snapshot['axes'])
+    apply_general_config(ax, legend, snapshot['config'], fonts=bool(snapshot['lines']))
+
+    files = []
+    for fmt in formats:
+        path = f'{basepath}.{fmt}'
+        start = time.perf_counter()
+        try:
+            with RenderMode.export_context():
+                fig.savefig(path, format=fmt, backend=RenderMode.export_backend(fmt))
+            files.append((path, time.perf_counter() - start, None))
+        except Exception as e:
+            files.append((path, time.perf_counter() - start, str(e)))
+    return files
+
+#Exporta los snapshots en paralelo y va devolviendo (slot, archivos) a medida que terminan.
+#Con cancel (un threading.Event) activado se dejan de exportar los pendientes.
+def export_snapshots(snapshots, outdir, formats, prefix='', workers=None, cancel=None):
+    os.makedirs(outdir, exist_ok=True)
+    basepaths = [os.path.join(outdir, f'{prefix}{slot_filename(snapshot["slot"])}') for snapshot in snapshots]
+    workers = min(MAX_WORKERS if workers is None else workers, len(snapshots))
+    if(workers < 2):
+        for (snapshot, basepath) in zip(snapshots, basepaths):
+            if cancel is not None and cancel.is_set():
+                return
+            yield render_snapshot(snapshot, basepath, formats)
+        return
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = {pool.submit(render_snapshot, snapshot, basepath, formats): snapshot['slot'] for (snapshot, basepath) in zip(snapshots, basepaths)}
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set():
+                    return
+                for future in done:
+                    slot = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield (slot, [('', 0.0, repr(e))])
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
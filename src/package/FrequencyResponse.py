@@ -0,0 +1,254 @@
+import numpy as np
+
+#Respuesta en frecuencia calculada a partir de los ceros y polos, sin expandir los polinomios.
+#Con H(s) = k * prod(s - z) / prod(s - p), cada raiz r = a + jb aporta por separado y en forma cerrada.
+
+#Maximo de elementos (frecuencias x raices) de cada bloque: asi los temporales entran en cache y no se arman
+#matrices enormes con grillas largas
+CHUNK_ELEMENTS = 2**16
+
+#Grilla adaptiva (ver adaptive_grid). Las frecuencias de aca son en rad/s.
+POINTS_PER_DECADE = 100
+DECADES_MARGIN = 2 #Decadas de mas a cada lado de la singularidad mas baja y la mas alta
+DEFAULT_SPAN = (2 * np.pi * 1e-2, 2 * np.pi * 1e6) #Si no hay singularidades, lo mismo que la grilla fija
+MIN_Q = 1 #Solo se agregan puntos alrededor de las singularidades con Q mayor
+NOTCH_WIDTH = 1e-4 #Ancho relativo que se usa para las raices sobre el eje (Q infinito)
+RESONANCE_POINTS = 40
+RESONANCE_WIDTHS = 8 #Hasta cuantos anchos de banda (w0/Q) a cada lado de w0
+MAX_DB_STEP = 0.5
+MAX_PHASE_STEP = 5 #Grados
+REFINE_PASSES = 8
+MAX_POINTS = 20000
+MIN_RELATIVE_STEP = 1e-9 #Intervalos mas finos que esto no se parten (en un notch la fase salta igual)
+
+#Suma sobre las raices de term(w, a, b), con w una fila de frecuencias y a, b columnas con las partes real e
+#imaginaria de las raices. Devuelve un array como w.
+#Los bloques son (raices x frecuencias): sumar sobre el primer eje es mucho mas rapido que sobre uno corto al final.
+def root_sum(roots, w, term):
+    roots = np.asarray(roots, dtype=np.complex128).ravel()
+    w = np.asarray(w, dtype=np.float64)
+    out = np.zeros(w.shape)
+    if not len(roots):
+        return out
+    (a, b) = (roots.real[:, None], roots.imag[:, None])
+    flat_w = w.ravel()
+    flat_out = out.ravel()
+    step = max(1, CHUNK_ELEMENTS // len(roots))
+    for i in range(0, len(flat_w), step):
+        flat_out[i:i + step] = term(flat_w[None, i:i + step], a, b).sum(axis=0)
+    return out
+
+def delay_term(w, a, b):
+    terms = w - b
+    terms *= terms
+    terms += a * a
+    np.divide(a, terms, out=terms)
+    return terms
+
+#Suma sobre las raices de a / (a^2 + (w - b)^2), que es -d/dw arg(jw - r).
+#Las raices sobre el eje (a = 0) no aportan: su fase es constante salvo el salto en w = b, donde no hay derivada.
+def root_delay_sum(roots, w):
+    roots = np.asarray(roots, dtype=np.complex128).ravel()
+    return root_sum(roots[roots.real != 0], w, delay_term)
+
+#Retardo de grupo -d(phi)/dw en segundos, con w en rad/s
+def group_delay(z, p, w):
+    return root_delay_sum(z, w) - root_delay_sum(p, w)
+
+#Secciones de orden 1 y 2 de un conjunto de raices: (reales, (a, w0^2) de cada par conjugado a +- jb).
+#Si las complejas no vienen de a pares (coeficientes no reales) van todas como orden 1, con su parte imaginaria.
+def sections(roots):
+    roots = np.asarray(roots, dtype=np.complex128).ravel()
+    upper = roots[roots.imag > 0]
+    lower = roots[roots.imag < 0]
+    if(len(upper) != len(lower)):
+        return (roots, np.empty(0), np.empty(0))
+    return (roots[roots.imag == 0], upper.real, np.abs(upper)**2)
+
+#Filas de distinto largo en un array 2-D, completando con NaN las mas cortas
+def pad_rows(rows, dtype):
+    rows = [np.asarray(row, dtype=dtype).ravel() for row in rows]
+    padded = np.full((len(rows), max((len(row) for row in rows), default=0)), np.nan, dtype=dtype)
+    for (i, row) in enumerate(rows):
+        padded[i, :len(row)] = row
+    return padded
+
+#Secciones (ver sections) de las raices de varias transferencias: (reales, a, w0^2), cada una como un array
+#(transferencia x seccion) con NaN de relleno
+def pad_sections(roots_list):
+    parts = [sections(roots) for roots in roots_list]
+    return (pad_rows([part[0] for part in parts], np.complex128), pad_rows([part[1] for part in parts], np.float64),
+            pad_rows([part[2] for part in parts], np.float64))
+
+#ufunc(*args) sumado sobre las secciones (eje 1); con valid, solo donde es True
+def masked_sum(ufunc, args, valid):
+    if valid is None:
+        return ufunc(*args).sum(axis=1)
+    return ufunc(*args, out=np.zeros(np.broadcast(*args).shape), where=valid).sum(axis=1)
+
+#Aporte de las secciones de varias transferencias (ver pad_sections) a log10 |.|^2, la fase en radianes y
+#-d(fase)/dw. w es una grilla comun (frecuencias) o una por transferencia (transferencia x frecuencias).
+#Devuelve tres arrays (transferencia x frecuencias), o los suma multiplicados por sign a los de out.
+#El relleno no aporta, y una raiz o par sobre el eje no aporta retardo (ver root_delay_sum).
+#Se calcula por bloques (transferencias x secciones x frecuencias).
+def batch_section_sums(padded, w, sign=1, out=None):
+    (first, a, w0sq) = padded
+    w = np.asarray(w, dtype=np.float64)
+    grid = np.broadcast_to(w, (len(first),) + w.shape[-1:])
+    (logmag, phase, delay) = (np.zeros(grid.shape), np.zeros(grid.shape), np.zeros(grid.shape)) if out is None else out
+    (valid1, valid2) = (~np.isnan(first.real), ~np.isnan(a))
+    (a1, b1) = (np.where(valid1, first.real, 0), np.where(valid1, first.imag, 0))
+    (a, w0sq) = (np.where(valid2, a, 0), np.where(valid2, w0sq, 0))
+    #Sin relleno no hace falta enmascarar
+    (valid1, valid2) = (None if valid1.all() else valid1, None if valid2.all() else valid2)
+    width = first.shape[1] + a.shape[1]
+    if not width:
+        return (logmag, phase, delay)
+    wstep = max(1, min(grid.shape[1], CHUNK_ELEMENTS // width))
+    tstep = max(1, CHUNK_ELEMENTS // (width * wstep))
+    with np.errstate(divide='ignore'):
+        for t in range(0, len(first), tstep):
+            rows = slice(t, t + tstep)
+            for i in range(0, grid.shape[1], wstep):
+                cols = slice(i, i + wstep)
+                x = grid[rows, None, cols]
+                if first.shape[1]:
+                    #Orden 1: jw - r = -a + j(w - b)
+                    (at, bt) = (a1[rows, :, None], b1[rows, :, None])
+                    vt = None if valid1 is None else valid1[rows, :, None]
+                    im = x - bt
+                    mag = im * im
+                    mag += at * at
+                    logmag[rows, cols] += sign * masked_sum(np.log10, (mag,), vt)
+                    phase[rows, cols] += sign * masked_sum(np.arctan2, (im, -at), vt)
+                    delay[rows, cols] += sign * np.divide(at, mag, out=im, where=mag != 0).sum(axis=1)
+                if a.shape[1]:
+                    #Orden 2: (jw)^2 - 2a jw + w0^2 = (w0^2 - w^2) - j 2aw, con retardo 2a (w0^2 + w^2) / |.|^2
+                    (at, w0t) = (a[rows, :, None], w0sq[rows, :, None])
+                    vt = None if valid2 is None else valid2[rows, :, None]
+                    x2 = x * x
+                    re = w0t - x2
+                    im = -2 * at * x
+                    im += 0.0 #Sin -0.0: en un par sobre el eje la fase salta +180, como si estuviera apenas a la izquierda
+                    mag = re * re
+                    mag += im * im
+                    logmag[rows, cols] += sign * masked_sum(np.log10, (mag,), vt)
+                    phase[rows, cols] += sign * masked_sum(np.arctan2, (im, re), vt)
+                    num = 2 * at * (w0t + x2)
+                    delay[rows, cols] += sign * np.divide(num, mag, out=num, where=mag != 0).sum(axis=1)
+    return (logmag, phase, delay)
+
+#Aporte de las secciones de un conjunto de raices a (log10 |.|^2, fase en radianes, -d(fase)/dw) en cada w
+def section_sums(roots, w):
+    w = np.asarray(w, dtype=np.float64)
+    return tuple(total[0].reshape(w.shape) for total in batch_section_sums(pad_sections([roots]), w.ravel()))
+
+#Modulo (lineal), fase (grados) y retardo de grupo (s) de H(jw) = k * prod(jw - z) / prod(jw - p), en una pasada
+#por las secciones de orden 1 y 2 de los ceros y polos, sin expandir los polinomios.
+#La fase sale continua (suma de las fases de cada seccion) y se corre en multiplos de 360 para que en w = reference
+#(por defecto w[0]) quede en (-180, 180], como despues de np.unwrap. Con la misma reference, dos grillas distintas
+#dan la misma fase en las frecuencias que comparten.
+def zpk_response(z, p, k, w, reference=None):
+    (zlog, zphase, zdelay) = section_sums(z, w)
+    (plog, pphase, pdelay) = section_sums(p, w)
+    with np.errstate(divide='ignore', over='ignore'):
+        mag = abs(k) * 10**((zlog - plog) / 2)
+    phase = np.degrees(np.angle(k) + zphase - pphase)
+    if reference is not None:
+        start = log_response(z, p, k, reference)[1]
+    elif np.size(phase):
+        start = np.ravel(phase)[0]
+    else:
+        start = 180
+    phase = phase - 360 * np.ceil((start - 180) / 360)
+    return (mag, phase, zdelay - pdelay)
+
+#Modulo en dB y fase en grados (sin correr) de H(jw)
+def log_response(z, p, k, w):
+    (zlog, zphase, _) = section_sums(z, w)
+    (plog, pphase, _) = section_sums(p, w)
+    with np.errstate(divide='ignore'):
+        return (20 * np.log10(abs(k)) + 10 * (zlog - plog), np.degrees(np.angle(k) + zphase - pphase))
+
+#Frecuencias (rad/s) alrededor de las singularidades con Q alto: mas juntas cuanto mas cerca de w0
+def resonance_points(roots):
+    roots = np.asarray(roots, dtype=np.complex128).ravel()
+    roots = roots[(roots.imag >= 0) & (roots != 0)]
+    w0 = np.abs(roots)
+    with np.errstate(divide='ignore'):
+        q = w0 / (2 * np.abs(roots.real))
+    keep = q > MIN_Q
+    (w0, q) = (w0[keep], q[keep])
+    if not len(w0):
+        return np.empty(0)
+    bandwidth = np.where(np.isfinite(q), w0 / q, w0 * NOTCH_WIDTH)
+    #Cantidad par de puntos: nunca se cae justo sobre un cero en el eje, donde |H| = 0
+    x = np.sinh(np.linspace(-np.arcsinh(2 * RESONANCE_WIDTHS), np.arcsinh(2 * RESONANCE_WIDTHS), RESONANCE_POINTS))
+    w = (w0[:, None] + bandwidth[:, None] / 2 * x).ravel()
+    return w[w > 0]
+
+#Rango (rad/s) en el que estan las singularidades de (z, p), con DECADES_MARGIN de cada lado
+def grid_span(z, p):
+    roots = np.concatenate((np.ravel(z), np.ravel(p))).astype(np.complex128)
+    w0 = np.abs(roots[roots != 0])
+    if not len(w0):
+        return DEFAULT_SPAN
+    return (w0.min() / 10**DECADES_MARGIN, w0.max() * 10**DECADES_MARGIN)
+
+#Grilla de frecuencias (rad/s) para el Bode de H = (z, p, k): una base logaritmica que cubre span (por defecto
+#grid_span), puntos extra alrededor de cada polo y cero con Q alto, y despues se parten los intervalos donde
+#el modulo o la fase cambian mas de MAX_DB_STEP o MAX_PHASE_STEP hasta REFINE_PASSES veces.
+def adaptive_grid(z, p, k, span=None, points_per_decade=POINTS_PER_DECADE):
+    roots = np.concatenate((np.ravel(z), np.ravel(p))).astype(np.complex128)
+    (lo, hi) = grid_span(z, p) if span is None else span
+    decades = np.log10(hi / lo)
+    w = np.logspace(np.log10(lo), np.log10(hi), int(np.ceil(decades * points_per_decade)) + 1)
+    extra = resonance_points(roots)
+    w = np.unique(np.concatenate((w, extra[(extra >= lo) & (extra <= hi)])))
+
+    (db, phase) = log_response(z, p, k, w)
+    for _ in range(REFINE_PASSES):
+        budget = MAX_POINTS - len(w)
+        if budget <= 0:
+            break
+        dphase = (np.diff(phase) + 180) % 360 - 180
+        error = np.maximum(np.abs(np.diff(db)) / MAX_DB_STEP, np.abs(dphase) / MAX_PHASE_STEP)
+        split = np.flatnonzero((error > 1) & (w[1:] > w[:-1] * (1 + MIN_RELATIVE_STEP)))
+        if not len(split):
+            break
+        if len(split) > budget:
+            split = split[np.argsort(error[split])[-budget:]]
+        middle = np.sqrt(w[split] * w[split + 1])
+        (mdb, mphase) = log_response(z, p, k, middle)
+        index = np.argsort(np.concatenate((w, middle)), kind='stable')
+        w = np.concatenate((w, middle))[index]
+        db = np.concatenate((db, mdb))[index]
+        phase = np.concatenate((phase, mphase))[index]
+    return w
+
+#zpk_response de muchas transferencias en la misma grilla w (rad/s), en un solo calculo con broadcasting.
+#zs y ps son listas con los ceros y polos de cada una, ks sus ganancias y reference (opcional) la frecuencia
+#de referencia de la fase de cada una. Devuelve modulo, fase (grados) y retardo como arrays (transferencia x w).
+def batch_zpk_response(zs, ps, ks, w, reference=None):
+    w = np.asarray(w, dtype=np.float64).ravel()
+    ks = np.asarray(ks).ravel()
+    (zsections, psections) = (pad_sections(zs), pad_sections(ps))
+    #Ceros y polos se acumulan en los mismos arrays, que despues se convierten en el lugar: con miles de
+    #transferencias cada array (transferencia x w) pesa bastante
+    (mag, phase, delay) = batch_section_sums(psections, w, sign=-1, out=batch_section_sums(zsections, w))
+    mag *= 0.5
+    with np.errstate(over='ignore'):
+        np.power(10.0, mag, out=mag)
+    mag *= np.abs(ks)[:, None]
+    phase += np.angle(ks)[:, None]
+    np.degrees(phase, out=phase)
+    if reference is not None:
+        reference = np.asarray(reference, dtype=np.float64).reshape(-1, 1)
+        start = np.degrees(np.angle(ks) + batch_section_sums(zsections, reference)[1][:, 0]
+                                       - batch_section_sums(psections, reference)[1][:, 0])
+    elif len(w):
+        start = phase[:, 0]
+    else:
+        start = np.full(len(ks), 180.0)
+    phase -= 360 * np.ceil((start[:, None] - 180) / 360)
+    return (mag, phase, delay)
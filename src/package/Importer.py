@@ -0,0 +1,111 @@
+import os
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import src.package.Dataset as DatasetModule
+from src.package.Dataset import Dataset
+import src.package.ParseCache as ParseCache
+
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 1) - 1))
+POLL_INTERVAL = 0.1
+
+class ImportCancelled(Exception):
+    pass
+
+#En los procesos del pool: cola para mandar el avance y evento de cancelacion, heredados al crear el proceso
+_progress_queue = None
+_cancel_event = None
+
+def _init_worker(progress_queue, cancel_event):
+    global _progress_queue, _cancel_event
+    _progress_queue = progress_queue
+    _cancel_event = cancel_event
+
+def normalize_path(filepath):
+    return os.path.normcase(os.path.abspath(filepath))
+
+#progress(filepath, bytes_leidos, bytes_totales, filas); si cancel (un Event) se activa se corta el parseo con ImportCancelled
+def load_dataset(filepath, progress=None, cancel=None):
+    def report(done, total, rows):
+        if cancel is not None and cancel.is_set():
+            raise ImportCancelled
+        if progress:
+            progress(filepath, done, total, rows)
+    return Dataset(filepath=filepath, progress=report)
+
+def _load_in_worker(filepath):
+    return load_dataset(filepath, progress=lambda *args: _progress_queue.put(args), cancel=_cancel_event)
+
+#Los .raw en modo perezoso solo se indexan y los archivos en el cache de parseo solo se mapean, no vale la pena
+#mandarlos a otro proceso (ademas habria que serializar el dataset entero para traerlo de vuelta).
+#Los .txt se parsean enteros salvo que sean perezosos y no haya cache.
+def needs_worker(filepath):
+    extension = os.path.splitext(filepath)[1].lower()
+    if ParseCache.contains(filepath):
+        return False
+    if(extension == '.raw'):
+        return not DatasetModule.LAZY_LOAD
+    if(extension == '.txt'):
+        return not (DatasetModule.LAZY_LOAD and not ParseCache.PARSE_CACHE)
+    return True
+
+#Saca los archivos repetidos o ya cargados antes de parsear nada
+def dedupe_paths(filepaths, loaded_origins=[]):
+    seen = set(normalize_path(origin) for origin in loaded_origins if isinstance(origin, str) and origin != '')
+    unique = []
+    for filepath in filepaths:
+        key = normalize_path(filepath)
+        if(key not in seen):
+            seen.add(key)
+            unique.append(filepath)
+    return unique
+
+#Parsea los archivos en paralelo y los va devolviendo a medida que terminan, como (filepath, Dataset).
+#Si un archivo no se puede leer o interpretar se devuelve la excepcion en lugar del Dataset, y se sigue con los demas.
+#Con cancel (un threading.Event) activado se dejan de parsear los archivos pendientes y se corta la iteracion.
+def import_datasets(filepaths, max_workers=None, progress=None, cancel=None):
+    max_workers = MAX_WORKERS if max_workers is None else max_workers
+    remote = [f for f in filepaths if needs_worker(f)]
+    local = [f for f in filepaths if not needs_worker(f)]
+    if(len(remote) < 2 or max_workers < 2):
+        local, remote = filepaths, []
+
+    pool = None
+    if remote:
+        context = multiprocessing.get_context('spawn')
+        progress_queue = context.Queue()
+        cancel_event = context.Event()
+        pool = ProcessPoolExecutor(max_workers=min(max_workers, len(remote)), mp_context=context,
+                                   initializer=_init_worker, initargs=(progress_queue, cancel_event))
+    try:
+        pending = {pool.submit(_load_in_worker, f): f for f in remote} if pool else {}
+        for f in local:
+            try:
+                yield (f, load_dataset(f, progress, cancel))
+            except ImportCancelled:
+                return
+            except Exception as e:
+                yield (f, e)
+        while pending:
+            done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            try:
+                while True:
+                    args = progress_queue.get_nowait()
+                    if progress:
+                        progress(*args)
+            except queue.Empty:
+                pass
+            if cancel is not None and cancel.is_set():
+                cancel_event.set()
+                return
+            for future in done:
+                f = pending.pop(future)
+                try:
+                    yield (f, future.result())
+                except ImportCancelled:
+                    return
+                except Exception as e:
+                    yield (f, e)
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
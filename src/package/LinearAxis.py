@@ -0,0 +1,112 @@
+import numpy as np
+
+#Maximo desvio (en fracciones de un paso) para considerar que una columna esta uniformemente muestreada
+UNIFORM_TOLERANCE = 1e-3
+
+#Eje implicito start + step * k, k = 0..length-1, para capturas de osciloscopio con muestreo uniforme.
+#No guarda las muestras: solo se genera el array cuando alguien lo pide (np.asarray, matplotlib),
+#escalarlo o desplazarlo devuelve otro LinearAxis, y buscar un rango de valores es O(1).
+class LinearAxis():
+    dtype = np.dtype(np.float64)
+    ndim = 1
+
+    def __init__(self, start=0.0, step=1.0, length=0):
+        self.start = float(start)
+        self.step = float(step)
+        self.length = int(length)
+
+    #Devuelve el LinearAxis equivalente a values, o None si no esta uniformemente muestreado
+    @classmethod
+    def from_samples(cls, values, tolerance=UNIFORM_TOLERANCE):
+        values = np.asarray(values)
+        if(values.ndim != 1 or len(values) < 2 or np.iscomplexobj(values) or not np.all(np.isfinite(values[[0, -1]]))):
+            return None
+        step = (values[-1] - values[0]) / (len(values) - 1)
+        if(step == 0):
+            return None
+        axis = cls(values[0], step, len(values))
+        deviation = np.max(np.abs(values - np.asarray(axis)))
+        return axis if deviation <= tolerance * abs(step) else None
+
+    @property
+    def nbytes(self):
+        return 0
+
+    @property
+    def real(self):
+        return self
+
+    @property
+    def stop(self):
+        return self.start + self.step * (self.length - 1)
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f'LinearAxis(start={self.start!r}, step={self.step!r}, length={self.length!r})'
+
+    def __eq__(self, other):
+        if isinstance(other, LinearAxis):
+            return (self.start, self.step, self.length) == (other.start, other.step, other.length)
+        return NotImplemented
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.start + self.step * np.arange(self.length, dtype=np.float64)
+        return values if dtype is None else values.astype(dtype)
+
+    def __iter__(self):
+        return iter(np.asarray(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            (first, last, stride) = key.indices(self.length)
+            return LinearAxis(self.start + self.step * first, self.step * stride, len(range(first, last, stride)))
+        if isinstance(key, (int, np.integer)):
+            if not -self.length <= key < self.length:
+                raise IndexError(key)
+            return self.start + self.step * (key % self.length)
+        key = np.asarray(key)
+        if np.issubdtype(key.dtype, np.integer):
+            if np.any((key < -self.length) | (key >= self.length)):
+                raise IndexError(key)
+            return self.start + self.step * (key % max(self.length, 1))
+        return np.asarray(self)[key]
+
+    def __mul__(self, k):
+        if np.isscalar(k) and not np.iscomplexobj(k):
+            return LinearAxis(self.start * k, self.step * k, self.length)
+        return np.asarray(self) * k
+
+    __rmul__ = __mul__
+
+    def __add__(self, k):
+        if np.isscalar(k) and not np.iscomplexobj(k):
+            return LinearAxis(self.start + k, self.step, self.length)
+        return np.asarray(self) + k
+
+    __radd__ = __add__
+
+    def __sub__(self, k):
+        return self + (-k)
+
+    def __neg__(self):
+        return self * -1
+
+    def min(self):
+        return min(self.start, self.stop)
+
+    def max(self):
+        return max(self.start, self.stop)
+
+    #Igual que np.searchsorted sobre el eje (si el paso es negativo el eje se toma como ordenado de mayor a menor)
+    def searchsorted(self, value, side='left'):
+        k = (np.asarray(value, dtype=np.float64) - self.start) / self.step
+        k = np.where(np.abs(k - np.round(k)) < 1e-9, np.round(k), k) #Que un valor justo sobre una muestra no se corra por redondeo
+        index = np.floor(k) + 1 if side == 'right' else np.ceil(k)
+        return np.clip(index, 0, self.length).astype(np.intp)
+
+    #Indices [first, last) de las muestras que caen dentro de [lo, hi]
+    def index_range(self, lo, hi):
+        (lo, hi) = (lo, hi) if self.step > 0 else (hi, lo)
+        return (int(self.searchsorted(lo, 'left')), int(self.searchsorted(hi, 'right')))
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from PyQt5.QtCore import QStandardPaths
+from src.package.CaseData import CaseData
+from src.package.LinearAxis import LinearAxis
+
+#Cache en disco de archivos ya parseados. Cada entrada es una carpeta con un meta.json y un .npy por columna
+#(los LinearAxis van en el meta.json), identificada por ruta absoluta, tamaño, mtime y PARSER_VERSION
+#(subirla cuando cambie como se parsea algo).
+#Al abrir un archivo cacheado las columnas se mapean con np.load(mmap_mode='r'), asi que carga en milisegundos.
+PARSE_CACHE = True
+PARSER_VERSION = 2
+CACHE_SIZE = 4 * 2**30
+CACHE_DIR = os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation), 'TC2-PlotTool', 'parse-cache')
+
+#Lo que se guarda del Dataset ademas de las columnas
+DATASET_ATTRS = ['casenames', 'miscinfo', 'suggestedXscale', 'suggestedYscale', 'suggestedXsource', 'suggestedYsource']
+
+def entry_path(filepath):
+    stat = os.stat(filepath)
+    key = f'{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}|{PARSER_VERSION}'
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+def contains(filepath):
+    try:
+        return PARSE_CACHE and os.path.isfile(os.path.join(entry_path(filepath), 'meta.json'))
+    except OSError:
+        return False
+
+#Carga el Dataset desde el cache. Devuelve False si no esta (o la entrada no sirve) y hay que parsear el archivo.
+def load(dataset, filepath, progress=None):
+    if not PARSE_CACHE:
+        return False
+    try:
+        entry = entry_path(filepath)
+        with open(os.path.join(entry, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        data = []
+        for (i, fields) in enumerate(meta['fields']):
+            data.append(CaseData())
+            for (x, field) in enumerate(fields):
+                if f'{i}_{x}' in meta['linear']:
+                    data[i][field] = LinearAxis(*meta['linear'][f'{i}_{x}'])
+                else:
+                    data[i][field] = load_column(os.path.join(entry, f'{i}_{x}.npy'))
+        os.utime(os.path.join(entry, 'meta.json')) #Marca de uso para el LRU
+    except (OSError, ValueError, KeyError):
+        return False
+    dataset.data = data
+    for attr in DATASET_ATTRS:
+        setattr(dataset, attr, meta[attr])
+    if progress:
+        size = os.path.getsize(filepath)
+        progress(size, size, sum(len(case[fields[0]]) for (case, fields) in zip(data, meta['fields']) if fields))
+    return True
+
+def load_column(path):
+    try:
+        return np.load(path, mmap_mode='r', allow_pickle=False)
+    except ValueError:
+        return np.load(path, allow_pickle=False) #Las columnas vacias no se pueden mapear
+
+#Guarda un Dataset recien parseado. Si no se puede escribir el cache se sigue sin el.
+def store(dataset, filepath):
+    if not PARSE_CACHE:
+        return
+    temp = None
+    try:
+        entry = entry_path(filepath)
+        temp = f'{entry}.{os.getpid()}.tmp'
+        os.makedirs(temp, exist_ok=True)
+        meta = {attr: getattr(dataset, attr) for attr in DATASET_ATTRS}
+        meta['path'] = os.path.abspath(filepath)
+        meta['fields'] = [list(case) for case in dataset.data]
+        meta['linear'] = {}
+        for (i, case) in enumerate(dataset.data):
+            for (x, field) in enumerate(case):
+                if isinstance(case[field], LinearAxis):
+                    meta['linear'][f'{i}_{x}'] = [case[field].start, case[field].step, case[field].length]
+                    continue
+                np.save(os.path.join(temp, f'{i}_{x}.npy'), np.asarray(case[field]), allow_pickle=False)
+        with open(os.path.join(temp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        try:
+            os.rename(temp, entry)
+        except OSError:
+            shutil.rmtree(temp, ignore_errors=True) #Otro proceso la guardo primero
+        evict()
+    except (OSError, TypeError, ValueError):
+        if temp:
+            shutil.rmtree(temp, ignore_errors=True)
+
+def entry_size(entry):
+    return sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+
+#Borra las entradas usadas hace mas tiempo hasta que el cache entre en CACHE_SIZE
+def evict(max_bytes=None):
+    max_bytes = CACHE_SIZE if max_bytes is None else max_bytes
+    entries = []
+    for e in os.scandir(CACHE_DIR):
+        meta = os.path.join(e.path, 'meta.json')
+        if e.is_dir() and os.path.isfile(meta):
+            entries.append((os.path.getmtime(meta), entry_size(e.path), e.path))
+    total = sum(size for (_, size, _) in entries)
+    for (_, size, path) in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            total -= size
+
+def clear():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
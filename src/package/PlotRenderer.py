@@ -0,0 +1,297 @@
+import numpy as np
+import matplotlib.ticker as ticker
+from scipy.signal import savgol_filter
+from src.package.Decimation import decimate
+from src.package.CaseData import ColumnCache
+
+MARKER_STYLES = { 'None': '', 'Point': '.',  'Pixel': ',',  'Circle': 'o',  'Triangle down': 'v',  'Triangle up': '^',  'Triangle left': '<',  'Triangle right': '>',  'Tri down': '1',  'Tri up': '2',  'Tri left': '3',  'Tri right': '4',  'Octagon': '8',  'Square': 's',  'Pentagon': 'p',  'Plus (filled)': 'P',  'Star': '*',  'Hexagon': 'h',  'Hexagon alt.': 'H',  'Plus': '+',  'x': 'x',  'x (filled)': 'X',  'Diamond': 'D',  'Diamond (thin)': 'd',  'Vline': '|',  'Hline': '_' }
+LINE_STYLES = { 'None': '', 'Solid': '-', 'Dashed': '--', 'Dash-dot': '-.', 'Dotted': ':' }
+
+#Transformaciones en grados: el eje y usa divisiones multiplo de 45
+ANGLE_TRANSFORMS = [2, 3, 6]
+
+TRANSFORM_CACHE_SIZE = 256 * 2**20
+
+#Indice de 'None' en el combo de posicion de la leyenda; los demas son el loc de matplotlib
+LEGEND_NONE = 11
+
+#Propiedades de un grafico que se guardan en los .fto
+def axes_properties(ax):
+    return {
+        "xlabel": ax.get_xlabel(),
+        "ylabel": ax.get_ylabel(),
+        "title": ax.get_title(),
+        "xlim": ax.get_xlim(),
+        "ylim": ax.get_ylim(),
+        "xscale": ax.get_xscale(),
+        "yscale": ax.get_yscale()
+    }
+
+def restore_axes_properties(ax, props):
+    ax.set_xlabel(props['xlabel'])
+    ax.set_ylabel(props['ylabel'])
+    ax.set_title(props['title'])
+    ax.set_xlim(props['xlim'])
+    ax.set_ylim(props['ylim'])
+    ax.set_xscale(props['xscale'])
+    ax.set_yscale(props['yscale'])
+
+#Tamaños de letra, leyenda y grilla segun la configuracion general de la sesion (MainWindow.getGeneralConfig)
+def apply_general_config(ax, legend, config, fonts=True):
+    if fonts:
+        for label in (ax.get_xticklabels() + ax.get_yticklabels()):
+            label.set_fontsize(config['ticksize_sb'])
+        ax.xaxis.label.set_size(config['labelsize_sb'])
+        ax.yaxis.label.set_size(config['labelsize_sb'])
+        ax.title.set_size(config['titlesize_sb'])
+    if(config['legendpos'] == LEGEND_NONE):
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+    else:
+        ax.legend(handles=legend, fontsize=config['legendsize_sb'], loc=config['legendpos'])
+    if config['grid']:
+        ax.grid(True, which="both", linestyle=':')
+    else:
+        ax.grid(False)
+
+def apply_transform(y, transform):
+    if(transform == 1):
+        return np.abs(y)
+    elif(transform == 2):
+        return np.angle(y, deg=True)
+    elif(transform == 3):
+        return np.unwrap(np.angle(y, deg=True), period=360)
+    elif(transform == 4):
+        return 20 * np.log10(y)
+    elif(transform == 5):
+        return 20 * np.log10(np.abs(y))
+    elif(transform == 6):
+        return np.unwrap(y, period=360)
+    return np.real(y)
+
+def apply_savgol(x, y, window, order):
+    try:
+        savgolw = int(window)
+        if(savgolw <= len(x)):
+            savgolo = int(order)
+            y = y if savgolw <= savgolo else savgol_filter(y, savgolw, savgolo)
+    except ValueError:
+        pass
+    return y
+
+#Resultado de transformar y suavizar una columna. Guarda la columna original para que su id no se pueda
+#reusar mientras la entrada este en el cache: si el Dataset reemplaza la columna, la entrada vieja ya no coincide.
+class TransformedColumn():
+    def __init__(self, column, values):
+        self.column = column
+        self.values = values
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + getattr(self.column, 'nbytes', 0)
+
+TRANSFORM_CACHE = ColumnCache(TRANSFORM_CACHE_SIZE)
+
+#y transformada y suavizada. Cambiar la escala o el desplazamiento de un Dataline no recalcula esto
+def transformed_column(x, y, transform, savgolwindow, savgolord):
+    key = (id(y), len(x), transform, savgolwindow, savgolord)
+    entry = TRANSFORM_CACHE.get(key)
+    if entry is not None and entry.column is y:
+        return entry.values
+    values = apply_savgol(x, apply_transform(y, transform), savgolwindow, savgolord)
+    if values is not y:
+        TRANSFORM_CACHE.put(key, TransformedColumn(y, values))
+    return values
+
+#Puntos de un Dataline ya transformados y escalados, sin diezmar
+def dataline_points(dl):
+    x, y = dl.dataset.get_datapoints(dl.xsource, dl.ysource, dl.casenum)
+    y = transformed_column(x, y, dl.transform, dl.savgolwindow, dl.savgolord)
+    return (x * dl.xscale + dl.xoffset, y * dl.yscale + dl.yoffset)
+
+#Lo que cambia los datos de la linea; si no cambio no hace falta recalcular nada
+def data_key(dl):
+    return (id(dl.dataset), dl.xsource, dl.ysource, dl.casenum, dl.transform, dl.xscale, dl.xoffset,
+            dl.yscale, dl.yoffset, dl.savgolwindow, dl.savgolord, dl.decimation, markers_only(dl))
+
+#Las lineas solo de marcadores se diezman distinto (ver Decimation.occupancy)
+def markers_only(dl):
+    return dl.linestyle == 'None'
+
+def style_key(dl):
+    return (dl.name, dl.color, dl.linestyle, dl.linewidth, dl.markerstyle, dl.markersize)
+
+def y_locator(angle):
+    return ticker.MaxNLocator(nbins='auto', steps=[1.8,2.25,4.5,9]) if angle else ticker.AutoLocator()
+
+class RenderedLine():
+    def __init__(self, line):
+        self.line = line
+        self.data_key = None
+        self.style_key = None
+        self.view_key = None
+        self.full_data = None #(x, y) completos si la linea esta diezmada
+        self.overview = None #La linea entera diezmada, para cuando se ve todo el eje x
+        self.window = None #Ventana (primera muestra, ultima, pixeles, log) rediezmada por un zoom, o None
+        self.ranged = None #Columnas (x, y) recalculadas por el Dataset para el rango visible, o None
+        self.direction = 1 #1 si x es creciente, -1 si es decreciente
+        self.error = False
+
+#Render en modo retenido de los Datalines de un Axes: cada Dataline tiene su Line2D, que se crea al agregarlo
+#y se borra al sacarlo. Un cambio de estilo solo llama a los setters de esa linea, y los datos solo se
+#recalculan (set_data) cuando cambia algo que los afecta. No depende de Qt.
+class PlotRenderer():
+    def __init__(self, ax):
+        self.ax = ax
+        self.rendered = {} #Dataline -> RenderedLine
+
+    @property
+    def full_data(self):
+        return {r.line: r.full_data for r in self.rendered.values() if r.full_data is not None}
+
+    #Descarta los datos calculados, por ejemplo si cambiaron las columnas de un Dataset
+    def invalidate(self):
+        for r in self.rendered.values():
+            r.data_key = None
+
+    #Deja en el Axes exactamente una linea por cada Dataline de datalines.
+    #Devuelve las lineas que van en la leyenda y la lista de Datalines con fuentes de datos incompatibles.
+    def render(self, datalines):
+        for dl in [dl for dl in self.rendered if dl not in datalines]:
+            self.rendered.pop(dl).line.remove()
+
+        view = self.view()
+        changed = False
+        errors = []
+        for dl in datalines:
+            r = self.rendered.get(dl)
+            if r is None:
+                (line,) = self.ax.plot([], [])
+                r = self.rendered[dl] = RenderedLine(line)
+            if(r.data_key != data_key(dl) or r.view_key != view or (dl.dirty and dl.dataset.dirty)):
+                self.update_data(r, dl, view)
+                changed = True
+            if r.error:
+                errors.append(dl)
+            if(r.style_key != style_key(dl)):
+                self.update_style(r, dl)
+
+        #Misma pila que antes: las lineas se dibujan en el orden de los Datalines
+        for (z, dl) in enumerate(datalines):
+            if(self.rendered[dl].line.get_zorder() != 2 + z * 1e-6):
+                self.rendered[dl].line.set_zorder(2 + z * 1e-6)
+        if datalines:
+            self.ax.yaxis.set_major_locator(y_locator(datalines[-1].transform in ANGLE_TRANSFORMS))
+        if changed:
+            self.ax.relim()
+            self.ax.autoscale_view()
+        self.refine()
+
+        legend = [self.rendered[dl].line for dl in datalines if dl.name != '' and dl.name[0] != '_' and not self.rendered[dl].error]
+        return (legend, errors)
+
+    #Tamaño en pixeles y escalas del Axes: si cambian hay que volver a diezmar
+    def view(self):
+        return (self.ax.bbox.width, self.ax.get_xscale(), self.ax.bbox.height, self.ax.get_yscale())
+
+    def decimate(self, dl, x, y):
+        (width, xscale, height, yscale) = self.view()
+        if markers_only(dl):
+            return decimate(x, y, dl.decimation, width, xscale == 'log', height, yscale == 'log')
+        return decimate(x, y, dl.decimation, width, xscale == 'log')
+
+    def update_data(self, r, dl, view):
+        r.data_key = data_key(dl)
+        r.view_key = view
+        r.full_data = None
+        try:
+            (x, y) = dataline_points(dl)
+            if(len(x) != len(y)):
+                raise ValueError
+            xd, yd = self.decimate(dl, x, y)
+        except (ValueError, KeyError, IndexError):
+            r.error = True
+            r.line.set_data([], [])
+            return
+        r.error = False
+        r.line.set_data(xd, yd)
+        r.window = None
+        r.ranged = None
+        r.overview = (xd, yd)
+        if(len(xd) != len(x)):
+            #Si se diezmo es porque x es monotono
+            r.full_data = (x, y)
+            r.direction = 1 if x[-1] >= x[0] else -1
+
+    #Con el grafico ampliado, vuelve a diezmar solo las muestras que caen en el rango x visible, asi se ve
+    #todo el detalle. Si el Dataset puede recalcular ese rango con mas resolucion (transferencias) se usa eso.
+    #Con el eje entero a la vista se vuelve a la linea diezmada completa.
+    #Devuelve True si cambio alguna linea.
+    def refine(self):
+        (lo, hi) = sorted(self.ax.get_xlim())
+        changed = False
+        for (dl, r) in self.rendered.items():
+            if r.error:
+                continue
+            ranged = self.range_columns(dl, r, lo, hi, self.ax.bbox.width)
+            if ranged is not None:
+                if(r.ranged is None or r.ranged[0] is not ranged[0] or r.ranged[1] is not ranged[1]):
+                    r.ranged = ranged
+                    r.window = None
+                    (x, y) = ranged
+                    y = transformed_column(x, y, dl.transform, dl.savgolwindow, dl.savgolord)
+                    r.line.set_data(*self.decimate(dl, x * dl.xscale + dl.xoffset, y * dl.yscale + dl.yoffset))
+                    changed = True
+                continue
+            if r.ranged is not None:
+                r.ranged = None
+                r.window = None
+                r.line.set_data(*r.overview)
+                changed = True
+            if r.full_data is None:
+                continue
+            (x, y) = r.full_data
+            if(r.direction < 0):
+                (x, y) = (x[::-1], y[::-1])
+            first = max(int(x.searchsorted(lo, 'left')) - 1, 0)
+            last = min(int(x.searchsorted(hi, 'right')) + 1, len(x))
+            window = None if (first, last) == (0, len(x)) else (first, last, self.view())
+            if(window == r.window):
+                continue
+            r.window = window
+            if window is None:
+                r.line.set_data(*r.overview)
+            else:
+                r.line.set_data(*self.decimate(dl, x[first:last], y[first:last]))
+            changed = True
+        return changed
+
+    #Columnas del Dataset recalculadas para ver [lo, hi] (en coordenadas del grafico), o None si no hace falta
+    #porque se ve toda la linea o porque el Dataset no sabe recalcular
+    def range_columns(self, dl, r, lo, hi, pixels):
+        get_range = getattr(dl.dataset, 'get_datapoints_range', None)
+        x = r.overview[0] if r.overview is not None else []
+        if(get_range is None or dl.xscale == 0 or len(x) == 0 or (lo <= min(x[0], x[-1]) and hi >= max(x[0], x[-1]))):
+            return None
+        (a, b) = sorted(((lo - dl.xoffset) / dl.xscale, (hi - dl.xoffset) / dl.xscale))
+        try:
+            return get_range(dl.xsource, dl.ysource, dl.casenum, a, b, pixels)
+        except (ValueError, KeyError, IndexError, AttributeError, TypeError):
+            return None #Se sigue con las columnas de siempre
+
+    #Vuelve todas las lineas a sus datos completos (diezmados), por ejemplo para que relim vea todo
+    def reset_view_data(self):
+        for r in self.rendered.values():
+            if(not r.error and (r.window is not None or r.ranged is not None)):
+                r.window = None
+                r.ranged = None
+                r.line.set_data(*r.overview)
+
+    def update_style(self, r, dl):
+        r.style_key = style_key(dl)
+        r.line.set_label(dl.name)
+        r.line.set_color(dl.color)
+        r.line.set_linestyle(LINE_STYLES[dl.linestyle])
+        r.line.set_linewidth(dl.linewidth)
+        r.line.set_marker(MARKER_STYLES[dl.markerstyle])
+        r.line.set_markersize(dl.markersize)
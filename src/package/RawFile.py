@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from src.package.CaseData import new_source_token
+
+MAX_HEADER_SIZE = int(1e6)
+SPLIT_CHUNK = 2**20
+#Solo en estos analisis LTspice marca puntos del eje con el signo; en un barrido DC el signo es parte del valor
+SIGNED_AXIS_MODES = ['Transient', 'AC', 'FFT']
+
+#Lector nativo de los .raw binarios de LTspice. El archivo se mapea en memoria y cada variable
+#de cada caso se expone como una vista de NumPy sobre el mapeo, sin copiar los datos (en los archivos sin
+#fastaccess la vista no es contigua). Al abrirlo solo se lee el encabezado; las paginas del archivo se leen
+#recien cuando se usa una columna.
+class RawFile():
+    def __init__(self, filepath):
+        self.token = new_source_token()
+        self.filepath = filepath
+        self.title = ''
+        self.date = ''
+        self.plotname = ''
+        self.flags = []
+        self.mode = ''
+        self.filetype = ''
+        self.encoding = ''
+        self.variables = []
+        self.types = []
+        self.points = 0
+        self.header_size = 0
+        self._columns = []
+        self._splits = []
+
+        self.read_header()
+        if(self.filetype == 'Binary'):
+            self.map_data()
+            self.split_cases()
+
+    def read_header(self):
+        with open(self.filepath, 'rb') as f:
+            head = f.read(MAX_HEADER_SIZE)
+        self.encoding = 'utf-16-le' if head[1:2] == b'\x00' else 'utf-8'
+        for marker in ['Binary:\n', 'Values:\n']:
+            end = head.find(marker.encode(self.encoding))
+            if(end != -1):
+                self.filetype = marker[:-2]
+                self.header_size = end + len(marker.encode(self.encoding))
+                break
+        else:
+            raise ValueError
+
+        lines = head[:self.header_size].decode(self.encoding).splitlines()
+        varline = lines.index('Variables:')
+        for line in lines[:varline]:
+            (tag, _, value) = line.partition(':')
+            value = value.strip()
+            if(tag == 'Title'):
+                self.title = value
+            elif(tag == 'Date'):
+                self.date = value
+            elif(tag == 'Plotname'):
+                self.plotname = value
+            elif(tag == 'Flags'):
+                self.flags = value.split()
+            elif(tag == 'No. Points'):
+                self.points = int(value)
+        for line in lines[varline + 1:-1]:
+            _, name, vartype = line.split()[:3]
+            self.variables.append(name)
+            self.types.append(vartype)
+
+        for mode in ['FFT', 'Transient', 'AC', 'DC', 'Noise', 'Operating Point']:
+            if(mode in self.plotname):
+                self.mode = mode
+                break
+
+    #Como la libreria ltspice, la precision sale del tamaño de los datos: hay archivos en doble precision sin
+    #el flag 'double'. Se prueba primero lo que dicen los flags.
+    def data_formats(self):
+        if('complex' in self.flags):
+            layouts = [[np.complex128] * len(self.variables)]
+        else:
+            layouts = [[np.float64] * len(self.variables), [np.float64] + [np.float32] * (len(self.variables) - 1)]
+            if('double' not in self.flags):
+                layouts.reverse()
+        available = os.path.getsize(self.filepath) - self.header_size
+        for formats in layouts:
+            formats = [np.dtype(f).newbyteorder('<') for f in formats]
+            if(available == self.points * sum(f.itemsize for f in formats)):
+                return formats
+        raise ValueError(f'{os.path.basename(self.filepath)}: {available} bytes of data do not match {self.points} points '
+                         f'of {len(self.variables)} variables')
+
+    def map_data(self):
+        formats = self.data_formats()
+
+        if('fastaccess' in self.flags):
+            #Cada variable guardada entera, una detras de la otra
+            offset = self.header_size
+            for f in formats:
+                self._columns.append(np.memmap(self.filepath, dtype=f, mode='r', offset=offset, shape=(self.points,)))
+                offset += f.itemsize * self.points
+        else:
+            names = [f'v{x}' for x in range(len(formats))]
+            records = np.memmap(self.filepath, dtype=np.dtype({'names': names, 'formats': formats}),
+                                mode='r', offset=self.header_size, shape=(self.points,))
+            self._columns = [records[name] for name in names]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['token']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.token = new_source_token()
+
+    #Igual que la libreria ltspice: empieza un caso nuevo cada vez que el eje vuelve a su valor inicial.
+    #Si la simulacion no tiene .step no hace falta recorrer el eje.
+    def split_cases(self):
+        axis = self._columns[0]
+        signed = self.mode in SIGNED_AXIS_MODES
+        self._splits = [0]
+        if(self.points > 0 and 'stepped' in self.flags):
+            start = np.abs(axis[0]) if signed else axis[0]
+            for x in range(1, self.points, SPLIT_CHUNK):
+                chunk = np.abs(axis[x:x + SPLIT_CHUNK]) if signed else axis[x:x + SPLIT_CHUNK]
+                self._splits.extend((np.flatnonzero(chunk == start) + x).tolist())
+        self._splits.append(self.points)
+
+    @property
+    def case_count(self):
+        return len(self._splits) - 1
+
+    def get_axis(self, case=0):
+        axis = self._columns[0][self._splits[case]:self._splits[case + 1]]
+        if(np.iscomplexobj(axis)):
+            axis = axis.real
+        #Si LTspice marco algunos puntos del eje con el signo no queda otra que copiar
+        if(self.mode in SIGNED_AXIS_MODES and np.any(np.signbit(axis))):
+            return np.abs(axis)
+        return axis
+
+    def get_data(self, name, case=0):
+        x = self.variables.index(name)
+        if(x == 0):
+            return self.get_axis(case)
+        return self._columns[x][self._splits[case]:self._splits[case + 1]]
+
+    #Vista sobre el mapeo; el que necesite la columna contigua la copia
+    def read_column(self, name, case=0):
+        return self.get_data(name, case)
+
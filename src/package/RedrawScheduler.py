@@ -0,0 +1,81 @@
+import time
+
+#Tiempo de un cuadro, en segundos. Si redibujar tarda mas, se espera lo mismo que tardo antes del proximo,
+#asi al menos la mitad del tiempo queda libre para la interfaz
+FRAME_BUDGET = 1 / 60
+
+#Lleva la cuenta de que graficos hay que redibujar. Quien cambia algo lo marca:
+#  mark_dataline(dl)  cambio un Dataline (estilo, datos o grafico en el que va)
+#  mark_dataset(ds)   cambiaron las columnas de un Dataset: se recalculan todas sus lineas
+#  mark_canvas(c)     cambio una propiedad de un grafico (limites, escalas)
+#  mark_all()         cambio algo comun a todos los graficos (tamaños de letra, leyenda, grilla)
+#y despues llama a flush, que redibuja solo los graficos sucios que estan a la vista.
+#Los de otras pestañas quedan sucios hasta que se muestran (o hasta un flush(canvases) con ellos, al exportar).
+#Para no redibujar en cada paso de un spinbox, la interfaz junta los pedidos y llama a flush a lo sumo una vez
+#por cuadro: next_delay dice cuanto esperar segun lo que tardo el ultimo redibujo.
+class RedrawScheduler():
+    #canvases: todos los graficos, en el orden de Dataline.plots
+    #datalines(): todos los Datalines, en el orden en que se dibujan
+    #redraw(canvas, datalines): redibuja un grafico con sus Datalines
+    #visible(): los graficos que estan a la vista
+    def __init__(self, canvases, datalines, redraw, visible):
+        self.canvases = canvases
+        self.datalines = datalines
+        self.redraw = redraw
+        self.visible = visible
+        self.drawn_on = {} #Dataline -> grafico en el que se dibujo por ultima vez
+        self.last_flush_time = 0.0
+        self.mark_all()
+
+    def mark_canvas(self, canvas):
+        canvas.dirty = True
+
+    def mark_all(self):
+        for canvas in self.canvases:
+            canvas.dirty = True
+
+    def mark_dataline(self, dl):
+        dl.dirty = True
+        if(0 <= dl.plots < len(self.canvases)):
+            self.mark_canvas(self.canvases[dl.plots])
+        if dl in self.drawn_on:
+            self.mark_canvas(self.drawn_on[dl])
+
+    def mark_dataset(self, ds):
+        ds.dirty = True
+        for dl in ds.datalines:
+            self.mark_dataline(dl)
+
+    def is_dirty(self):
+        return any(canvas.dirty for canvas in self.canvases)
+
+    #Segundos a esperar antes del proximo flush
+    def next_delay(self):
+        return max(FRAME_BUDGET, self.last_flush_time)
+
+    #canvases: los graficos a redibujar si estan sucios; por defecto los que estan a la vista
+    def flush(self, canvases=None):
+        pending = [canvas for canvas in (self.visible() if canvases is None else canvases) if canvas.dirty]
+        if not pending:
+            return []
+        start = time.perf_counter()
+        groups = {canvas: [] for canvas in pending}
+        for dl in self.datalines():
+            if(0 <= dl.plots < len(self.canvases) and self.canvases[dl.plots] in groups):
+                groups[self.canvases[dl.plots]].append(dl)
+
+        for (canvas, datalines) in groups.items():
+            self.redraw(canvas, datalines)
+            canvas.dirty = False
+            for dl in [dl for (dl, drawn) in self.drawn_on.items() if drawn is canvas]:
+                del self.drawn_on[dl]
+            for dl in datalines:
+                dl.dirty = False
+                self.drawn_on[dl] = canvas
+
+        #Un Dataset deja de estar sucio cuando ya se redibujaron todas sus lineas
+        for ds in {dl.dataset for datalines in groups.values() for dl in datalines}:
+            if ds.dirty and not any(dl.dirty for dl in ds.datalines):
+                ds.dirty = False
+        self.last_flush_time = time.perf_counter() - start
+        return pending
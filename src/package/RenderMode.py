@@ -0,0 +1,43 @@
+import matplotlib
+from contextlib import contextmanager
+
+#Modos de dibujo. En la interfaz se usa Agg (QtAgg) con mathtext, que matplotlib cachea, y nada de LaTeX.
+#La configuracion de pgf/pdflatex solo se activa dentro de export_context, al guardar una figura.
+
+#Estilo de las figuras, igual en la interfaz y al exportar
+FIGURE_STYLE = {
+    'font.family': 'serif',
+    'text.usetex': False,
+    'legend.fancybox': False,
+    'legend.edgecolor': 'black',
+    'savefig.format': 'pdf'
+}
+
+#Solo para exportar: pdflatex y las fuentes del documento en los .pgf
+EXPORT_STYLE = {
+    'pgf.texsystem': 'pdflatex',
+    'pgf.rcfonts': False,
+}
+
+#Con True los .pdf tambien se generan con pdflatex (backend pgf) en lugar del backend pdf de matplotlib
+PDF_VIA_LATEX = False
+
+_interactive = None
+
+#Backend y estilo para dibujar en pantalla (backend='Agg' para dibujar sin interfaz). Se puede llamar varias veces.
+def use_interactive(backend='QtAgg'):
+    global _interactive
+    if _interactive != backend:
+        matplotlib.use(backend)
+        _interactive = backend
+    matplotlib.rcParams.update(FIGURE_STYLE)
+
+#Backend para guardar en fmt: None es el que matplotlib tiene registrado para ese formato
+def export_backend(fmt):
+    return 'pgf' if fmt == 'pdf' and PDF_VIA_LATEX else None
+
+#Contexto para guardar figuras: activa la configuracion de LaTeX y la saca al terminar
+@contextmanager
+def export_context():
+    with matplotlib.rc_context(EXPORT_STYLE):
+        yield
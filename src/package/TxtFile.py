@@ -0,0 +1,89 @@
+import io
+import locale
+import mmap
+import os
+import numpy as np
+from src.package.CaseData import new_source_token
+
+STEP_TAG = b'Step Information:'
+
+#Indice de un .txt exportado por LTspice: al abrirlo solo se leen los nombres de los campos y se ubican
+#los 'Step Information:' de cada caso. Los bloques se parsean enteros (read_block) o de a una columna (read_column).
+class TxtFile():
+    def __init__(self, filepath):
+        self.token = new_source_token()
+        self.filepath = filepath
+        self.encoding = locale.getpreferredencoding(False)
+        self.variables = []
+        self.casenames = []
+        self._blocks = []
+        self._loaded = None
+        self.index()
+
+    def index(self):
+        with open(self.filepath, 'rb') as f:
+            header = f.readline()
+            self.variables = header.decode(self.encoding).replace('\r', '').replace('\n', '').split('\t')
+            start = len(header)
+            size = os.fstat(f.fileno()).st_size
+            if(size == start):
+                self._blocks.append((start, size))
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                step = mm.find(STEP_TAG, start)
+                if(step == -1):
+                    self._blocks.append((start, size))
+                elif(mm[start:step].strip() != b''):
+                    self._blocks.append((start, step))
+                while(step != -1):
+                    eol = mm.find(b'\n', step)
+                    eol = size if eol == -1 else eol
+                    line = mm[step:eol].decode(self.encoding)
+                    self.casenames.append(line[18:line.index('  (Run: ')])
+                    step = mm.find(STEP_TAG, eol)
+                    self._blocks.append((eol + 1, size if step == -1 else step))
+
+    #Al guardar el proyecto se guardan los datos ya parseados, asi el .fto no depende del .txt
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['token']
+        state['_loaded'] = [self.read_block(case) for case in range(self.case_count)]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.token = new_source_token()
+
+    @property
+    def case_count(self):
+        return len(self._blocks)
+
+    def read_text(self, case):
+        (start, end) = self._blocks[case]
+        with open(self.filepath, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start).decode(self.encoding)
+
+    def parse(self, case, usecols=None):
+        text = self.read_text(case)
+        try:
+            values = np.loadtxt(io.StringIO(text), delimiter='\t', dtype=np.float64, ndmin=2, usecols=usecols)
+        except ValueError:
+            values = np.loadtxt(io.StringIO(text), delimiter='\t', dtype=np.complex128, ndmin=2, usecols=usecols)
+        if(values.size == 0):
+            values = np.empty((0, len(self.variables) if usecols is None else len(usecols)), dtype=values.dtype)
+        if(np.iscomplexobj(values) and not np.any(values.imag)):
+            values = values.real
+        return values
+
+    #Bloque 2-D (campos x muestras) con todas las columnas del caso
+    def read_block(self, case=0):
+        if(self._loaded is not None):
+            return self._loaded[case]
+        return np.ascontiguousarray(self.parse(case).T)
+
+    def read_column(self, name, case=0):
+        x = self.variables.index(name)
+        if(self._loaded is not None):
+            return self._loaded[case][x]
+        return np.ascontiguousarray(self.parse(case, usecols=[x])[:, 0])
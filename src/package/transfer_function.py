@@ -4,6 +4,7 @@ from scipy.optimize import basinhopping
 import numpy as np
 from numpy.polynomial import Polynomial
 from .Parser import ExprParser
+from . import FrequencyResponse
 import traceback
 
 # Evaluate a polynomial in reverse order using Horner's Rule,
@@ -115,11 +116,10 @@ class TFunction():
     def maxFunctionMod(self, w):
         return -abs(self.at(1j*w))
     
-    #como ln(H) = ln(G) + j phi --> H'/H = G'/G + j phi'
+    #como ln(H) = ln(G) + j phi --> H'/H = G'/G + j phi', y H'/H = sum 1/(s - z) - sum 1/(s - p)
+    #Se suma el aporte de cada cero y polo en vez de derivar N y D expandidos, que con orden alto pierden toda la precision
     def gd_at(self, w0):
-        if not self.computedDerivatives:
-            self.getDerivatives()
-        return -np.imag(1j*(poly_at(self.dN, 1j*w0)/poly_at(self.N, 1j*w0) - poly_at(self.dD, 1j*w0)/poly_at(self.D, 1j*w0))) #'1j*..' --> regla de la cadena
+        return FrequencyResponse.group_delay(self.z, self.p, w0)
         
     def getZP(self, in_hz=False):
         if(in_hz):
@@ -127,16 +127,19 @@ class TFunction():
         else:
             return self.z, self.p
 
-    def getBode(self, linear=False, start=-2, stop=6, num=10000):
-        if linear:
-            ws = np.linspace(start, stop, num) * 2 * np.pi
+    #Sin start, stop ni num la grilla se arma segun los polos y ceros (ver FrequencyResponse.adaptive_grid);
+    #si se pasa alguno, es la grilla fija de siempre en Hz (decadas si no es linear), con el resto por defecto
+    def getBode(self, linear=False, start=None, stop=None, num=None):
+        if not linear and start is None and stop is None and num is None:
+            ws = FrequencyResponse.adaptive_grid(self.z, self.p, self.k)
+        elif linear:
+            ws = np.linspace(-2 if start is None else start, 6 if stop is None else stop, 10000 if num is None else num) * 2 * np.pi
         else:
-            ws = np.logspace(start, stop, num) * 2 * np.pi
-        #h = self.at(1j*ws)
-        w, g, ph = signal.bode(self.tf_object, w=ws)
-        gd = self.gd_at(ws) #/ (2 * np.pi) #--> no hay que hacer regla de cadena porque se achica tmb la escala de w
+            ws = np.logspace(-2 if start is None else start, 6 if stop is None else stop, 10000 if num is None else num) * 2 * np.pi
+        #Modulo, fase y retardo salen juntos de los ceros y polos (ver FrequencyResponse.zpk_response)
+        g, ph, gd = FrequencyResponse.zpk_response(self.z, self.p, self.k, ws) #gd en s: no hay que hacer regla de cadena porque se achica tmb la escala de w
         f = ws / (2 * np.pi)
-        return f, 10**(g/20), ph, gd
+        return f, g, ph, gd
 
     #No funciona (y no lo necesitamos) actualmente
     def optimize(self, start, stop, maximize = False):
@@ -161,4 +164,16 @@ class TFunction():
         self.setZPK([i for i in self.z if i not in tf.z], [i for i in self.p if i not in tf.p], self.k/tf.k)
         
     def getLatex(self, txt):
-        return self.eparser.getLatex()
\ No newline at end of file
+        return self.eparser.getLatex()
+
+#Bode de muchas transferencias en una misma grilla, evaluadas todas juntas (ver FrequencyResponse.batch_zpk_response).
+#Sin w, la grilla es logaritmica y cubre las singularidades de todas. Devuelve f (Hz) y modulo, fase y retardo
+#como arrays (transferencia x frecuencia); la fase de cada una coincide con la de su getBode.
+def batch_bode(tfs, w=None):
+    zpks = [tf.getZPK() for tf in tfs]
+    spans = np.array([FrequencyResponse.grid_span(z, p) for (z, p, k) in zpks]).reshape(-1, 2)
+    if w is None:
+        (lo, hi) = (spans[:, 0].min(), spans[:, 1].max()) if len(spans) else FrequencyResponse.DEFAULT_SPAN
+        w = np.logspace(np.log10(lo), np.log10(hi), int(np.ceil(np.log10(hi / lo) * FrequencyResponse.POINTS_PER_DECADE)) + 1)
+    g, ph, gd = FrequencyResponse.batch_zpk_response([z for (z, p, k) in zpks], [p for (z, p, k) in zpks], [k for (z, p, k) in zpks], w, reference=spans[:, 0])
+    return np.asarray(w) / (2 * np.pi), g, ph, gd
@@ -31,7 +31,7 @@ def elide_string(string, font=None, pixels=200, side="right"):
         font = QtWidgets.QLabel().font()
 
     metrics = QtGui.QFontMetrics(font)
-    mode = Qt.ElideRight if side is "right" else Qt.ElideLeft
+    mode = Qt.ElideRight if side == "right" else Qt.ElideLeft
 
     return metrics.elidedText(string, mode, pixels)
 
@@ -71,8 +71,8 @@ def icon_to_pixmap(icon, width, height=None):
     pr = QWindow().devicePixelRatio()
 
     if not is_hidpi:
-        width = width*pr
-        height = height*pr
+        width = int(width*pr)
+        height = int(height*pr)
     px = icon.pixmap(width, height)
     if not is_hidpi:
         px.setDevicePixelRatio(pr)
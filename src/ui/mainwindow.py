@@ -326,7 +326,7 @@ class Ui_MainWindow(object):
         self.gridLayout_6.setObjectName("gridLayout_6")
         self.dl_remove_btn = QtWidgets.QPushButton(self.dataline_gb)
         self.dl_remove_btn.setObjectName("dl_remove_btn")
-        self.gridLayout_6.addWidget(self.dl_remove_btn, 21, 0, 1, 2)
+        self.gridLayout_6.addWidget(self.dl_remove_btn, 22, 0, 1, 2)
         self.dl_render_cb = QtWidgets.QComboBox(self.dataline_gb)
         self.dl_render_cb.setObjectName("dl_render_cb")
         self.dl_render_cb.addItem("")
@@ -475,6 +475,15 @@ class Ui_MainWindow(object):
         self.dl_savgol_ord.setProperty("value", 1.0)
         self.dl_savgol_ord.setObjectName("dl_savgol_ord")
         self.gridLayout_6.addWidget(self.dl_savgol_ord, 20, 1, 1, 1)
+        self.label_92 = QtWidgets.QLabel(self.dataline_gb)
+        self.label_92.setObjectName("label_92")
+        self.gridLayout_6.addWidget(self.label_92, 21, 0, 1, 1)
+        self.dl_decimation_cb = QtWidgets.QComboBox(self.dataline_gb)
+        self.dl_decimation_cb.setObjectName("dl_decimation_cb")
+        self.dl_decimation_cb.addItem("")
+        self.dl_decimation_cb.addItem("")
+        self.dl_decimation_cb.addItem("")
+        self.gridLayout_6.addWidget(self.dl_decimation_cb, 21, 1, 1, 1)
         self.label_10 = QtWidgets.QLabel(self.dataline_gb)
         self.label_10.setObjectName("label_10")
         self.gridLayout_6.addWidget(self.label_10, 1, 0, 1, 1)
@@ -1091,10 +1100,14 @@ class Ui_MainWindow(object):
         self.actionLoad_2.setObjectName("actionLoad_2")
         self.actionSave_2 = QtWidgets.QAction(MainWindow)
         self.actionSave_2.setObjectName("actionSave_2")
+        self.actionExport_all = QtWidgets.QAction(MainWindow)
+        self.actionExport_all.setObjectName("actionExport_all")
         self.actionSet_size = QtWidgets.QAction(MainWindow)
         self.actionSet_size.setObjectName("actionSet_size")
         self.menuProject.addAction(self.actionLoad_2)
         self.menuProject.addAction(self.actionSave_2)
+        self.menuProject.addSeparator()
+        self.menuProject.addAction(self.actionExport_all)
         self.menuWindow.addAction(self.actionSet_size)
         self.menubar.addAction(self.menuProject.menuAction())
         self.menubar.addAction(self.menuWindow.menuAction())
@@ -1102,6 +1115,7 @@ class Ui_MainWindow(object):
         self.retranslateUi(MainWindow)
         self.tabWidget.setCurrentIndex(0)
         self.tabbing_plots.setCurrentIndex(0)
+        self.dl_decimation_cb.setCurrentIndex(1)
         self.compareapprox_cb.setCurrentIndex(-1)
         self.tabWidget_2.setCurrentIndex(0)
         self.tabWidget_3.setCurrentIndex(0)
@@ -1143,7 +1157,8 @@ class Ui_MainWindow(object):
         MainWindow.setTabOrder(self.dl_marker_cb, self.dl_markersize_sb)
         MainWindow.setTabOrder(self.dl_markersize_sb, self.dl_savgol_wlen)
         MainWindow.setTabOrder(self.dl_savgol_wlen, self.dl_savgol_ord)
-        MainWindow.setTabOrder(self.dl_savgol_ord, self.dl_remove_btn)
+        MainWindow.setTabOrder(self.dl_savgol_ord, self.dl_decimation_cb)
+        MainWindow.setTabOrder(self.dl_decimation_cb, self.dl_remove_btn)
         MainWindow.setTabOrder(self.dl_remove_btn, self.resp_btn)
         MainWindow.setTabOrder(self.resp_btn, self.scrollArea_3)
         MainWindow.setTabOrder(self.scrollArea_3, self.selfil_cb)
@@ -1285,6 +1300,10 @@ class Ui_MainWindow(object):
         self.label_2.setText(_translate("MainWindow", "Y data"))
         self.label_6.setText(_translate("MainWindow", "Y scale"))
         self.label_22.setText(_translate("MainWindow", "Transform"))
+        self.label_92.setText(_translate("MainWindow", "Decimation"))
+        self.dl_decimation_cb.setItemText(0, _translate("MainWindow", "None"))
+        self.dl_decimation_cb.setItemText(1, _translate("MainWindow", "Min/Max (M4)"))
+        self.dl_decimation_cb.setItemText(2, _translate("MainWindow", "LTTB"))
         self.label_10.setText(_translate("MainWindow", "Render"))
         self.dl_transform_cb.setItemText(0, _translate("MainWindow", "None"))
         self.dl_transform_cb.setItemText(1, _translate("MainWindow", "|.|"))
@@ -1399,6 +1418,7 @@ class Ui_MainWindow(object):
         self.actionSave.setText(_translate("MainWindow", "Save"))
         self.actionLoad_2.setText(_translate("MainWindow", "Load..."))
         self.actionSave_2.setText(_translate("MainWindow", "Save..."))
+        self.actionExport_all.setText(_translate("MainWindow", "Export all plots..."))
         self.actionSet_size.setText(_translate("MainWindow", "Set size"))
 from src.widgets.mplwidget import MplWidget
 from src.widgets.multiple_cbox import CheckableComboBox
@@ -0,0 +1,135 @@
+import numpy as np
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
+from src.package.Decimation import is_increasing
+
+#Indice para encontrar rapido la muestra mas cercana en x: si x no esta ordenado se ordena una sola vez
+class SnapIndex():
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        if is_increasing(x):
+            self.order = None
+            self.sorted_x = x
+        else:
+            self.order = np.argsort(np.asarray(x), kind='stable')
+            self.sorted_x = np.asarray(x)[self.order]
+
+    #Indice (en x, y) de la muestra con x mas cercano a value
+    def nearest(self, value):
+        i = int(self.sorted_x.searchsorted(value))
+        candidates = [k for k in (i - 1, i) if 0 <= k < len(self.sorted_x)]
+        k = min(candidates, key=lambda k: abs(self.sorted_x[k] - value))
+        return k if self.order is None else int(self.order[k])
+
+#Cruz que sigue al mouse y se pega a la muestra mas cercana de las lineas del grafico, con un cartel con
+#los valores. Se guarda el fondo en cada dibujo completo del canvas, y al mover el mouse solo se restaura
+#ese fondo y se dibujan la cruz y el cartel (blit), sin redibujar las lineas.
+#Los artistas no se agregan al Axes, asi no cuentan para los limites ni para la leyenda.
+class Crosshair():
+    def __init__(self, canvas, color='red'):
+        self.canvas = canvas
+        self.ax = canvas.ax
+        self.enabled = False
+        self.background = None
+        self.indexes = {} #Line2D -> SnapIndex de los datos con los que se armo
+
+        self.hline = Line2D([0, 1], [0, 0], color=color, linewidth=0.5, linestyle='--', transform=self.ax.transAxes)
+        self.vline = Line2D([0, 0], [0, 1], color=color, linewidth=0.5, linestyle='--', transform=self.ax.transAxes)
+        self.marker = Line2D([0], [0], color=color, marker='o', markersize=5, fillstyle='none', transform=self.ax.transData)
+        self.readout = Text(0.01, 0.99, '', transform=self.ax.transAxes, va='top', ha='left', fontsize='small',
+                            bbox={'facecolor': 'white', 'edgecolor': color, 'alpha': 0.8})
+        self.artists = [self.hline, self.vline, self.marker, self.readout]
+        for artist in self.artists:
+            artist.set_figure(canvas.fig)
+            artist.set_animated(True)
+            artist.set_visible(False)
+        for artist in (self.hline, self.vline, self.marker):
+            artist.set_clip_box(self.ax.bbox)
+
+        canvas.mpl_connect('draw_event', self.on_draw)
+        canvas.mpl_connect('motion_notify_event', self.on_move)
+        canvas.mpl_connect('axes_leave_event', self.on_leave)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.hide()
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.fig.bbox)
+        for artist in self.artists:
+            artist.set_visible(False)
+
+    def on_leave(self, event):
+        self.hide()
+
+    def hide(self):
+        if any(artist.get_visible() for artist in self.artists):
+            for artist in self.artists:
+                artist.set_visible(False)
+            self.blit()
+
+    #Lineas dibujadas con los datos completos (sin diezmar) para pegarse a muestras reales
+    def snap_targets(self):
+        full_data = self.canvas.plot_renderer.full_data
+        targets = []
+        for r in self.canvas.plot_renderer.rendered.values():
+            if r.error or not r.line.get_visible():
+                continue
+            (x, y) = full_data.get(r.line) or (r.line.get_xdata(orig=True), r.line.get_ydata(orig=True))
+            if(len(x) == 0 or len(x) != len(y)):
+                continue
+            index = self.indexes.get(r.line)
+            if index is None or index.x is not x or index.y is not y:
+                index = self.indexes[r.line] = SnapIndex(x, y)
+            targets.append((r.line, index))
+        for line in [line for line in self.indexes if line not in [t[0] for t in targets]]:
+            del self.indexes[line]
+        return targets
+
+    #De cada linea la muestra mas cercana en x al mouse; gana la que queda mas cerca en pantalla
+    def snap(self, event):
+        best = None
+        for (line, index) in self.snap_targets():
+            k = index.nearest(event.xdata)
+            (x, y) = (float(np.real(index.x[k])), float(np.real(index.y[k])))
+            (px, py) = self.ax.transData.transform((x, y))
+            distance = np.hypot(px - event.x, py - event.y)
+            if np.isfinite(distance) and (best is None or distance < best[0]):
+                best = (distance, line, x, y)
+        return best
+
+    def on_move(self, event):
+        if not self.enabled or self.background is None:
+            return
+        if(event.inaxes is not self.ax or event.button is not None or getattr(self.canvas.toolbar, 'mode', '')):
+            self.hide()
+            return
+        best = self.snap(event)
+        if best is None:
+            (x, y, label, color) = (event.xdata, event.ydata, '', self.marker.get_color())
+        else:
+            (_, line, x, y) = best
+            (label, color) = (line.get_label(), line.get_color())
+        (ax_x, ax_y) = self.ax.transAxes.inverted().transform(self.ax.transData.transform((x, y)))
+        self.vline.set_xdata([ax_x, ax_x])
+        self.hline.set_ydata([ax_y, ax_y])
+        self.marker.set_data([x], [y])
+        self.marker.set_markeredgecolor(color)
+        self.marker.set_visible(best is not None)
+        text = f'x = {x:.6g}\ny = {y:.6g}'
+        self.readout.set_text(text if label == '' or label.startswith('_') else f'{label}\n{text}')
+        for artist in (self.hline, self.vline, self.readout):
+            artist.set_visible(True)
+        self.blit()
+
+    def blit(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        renderer = self.canvas.get_renderer()
+        for artist in self.artists:
+            if artist.get_visible():
+                artist.draw(renderer)
+        self.canvas.blit(self.ax.bbox)
@@ -0,0 +1,79 @@
+import os
+import threading
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+
+import src.package.FigureExport as FigureExport
+from src.widgets.import_dialog import labutils
+
+#Exporta varios graficos a la vez. Los snapshots (y la memoria compartida con los datos grandes) se arman en el
+#hilo de la interfaz, y los archivos se generan en un pool de procesos desde un BackgroundTask.
+#El dialogo muestra cuanto tardo cada archivo y su boton Cancel deja sin exportar los pendientes.
+class FigureExportTask(QtCore.QObject):
+    sig_figure = QtCore.pyqtSignal(int, object)
+    sig_error = QtCore.pyqtSignal(str)
+    sig_finished = QtCore.pyqtSignal()
+
+    def __init__(self, snapshots, shared, outdir, formats, prefix='', parent=None):
+        super().__init__(parent)
+        self.snapshots = snapshots
+        self.shared = shared
+        self.outdir = outdir
+        self.formats = formats
+        self.prefix = prefix
+        self.cancelled = threading.Event()
+        self.results = []
+        self.failed = []
+        self.task = None
+
+        icon = QtWidgets.QApplication.style().standardIcon(QtWidgets.QStyle.SP_DialogSaveButton)
+        self.dialog = labutils.BackgroundTaskProgressDialog(icon, 'Exporting plots', self.describe(), cancel=True, parent=parent)
+        self.dialog.setModal(False)
+        self.dialog.setWindowModality(Qt.NonModal)
+        self.dialog.progressBar.setMaximum(len(snapshots))
+        self.dialog.rejected.connect(self.cancel)
+        self.dialog.destroyed.connect(self.forgetDialog)
+        self.sig_figure.connect(self.addResult)
+        self.sig_error.connect(self.failed.append)
+
+    def start(self):
+        self.dialog.show()
+        self.task = labutils.BackgroundTask(parent=self, target=self.run, autostart=False)
+        self.task.sig_done.connect(self.finish)
+        self.task.start()
+        #sig_done llega antes de que el hilo termine, asi que la tarea se borra recien cuando termino el hilo.
+        #El quit del hilo pasa por este hilo, por eso no puede terminar antes de conectarlo.
+        self.task.thread.finished.connect(self.deleteLater)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def forgetDialog(self):
+        self.dialog = None
+
+    #Corre en el hilo del BackgroundTask: no tocar widgets desde aca, solo emitir señales
+    def run(self):
+        try:
+            for (slot, files) in FigureExport.export_snapshots(self.snapshots, self.outdir, self.formats, self.prefix, cancel=self.cancelled):
+                self.sig_figure.emit(slot, files)
+        except Exception as e:
+            self.sig_error.emit(f'Export failed: {e!r}')
+
+    def finish(self, result=None):
+        self.shared.close()
+        if self.dialog is not None:
+            self.dialog.close()
+        self.sig_finished.emit()
+
+    def addResult(self, slot, files):
+        for (path, seconds, error) in files:
+            self.results.append(f'{os.path.basename(path)}: {seconds:.2f} s')
+            if error is not None:
+                self.failed.append(f'{FigureExport.SLOT_NAMES[slot]}: {error}')
+        if self.dialog is None:
+            return
+        self.dialog.progressBar.setValue(self.dialog.progressBar.value() + 1)
+        self.dialog.infoLabel.setText(self.describe())
+
+    def describe(self):
+        return '\n'.join([f'{len(self.snapshots)} plots to {self.outdir}'] + self.results)
@@ -2,18 +2,9 @@
 from PyQt5 import QtWidgets
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
-import matplotlib
+import src.package.RenderMode as RenderMode
 
-# Ensure using PyQt5 backend
-matplotlib.use('QT5Agg')
-matplotlib.use('pgf')
-matplotlib.rcParams.update({
-    "pgf.texsystem": "pdflatex",
-    'font.family': 'serif',
-    'pgf.rcfonts': False,
-    'legend.fancybox': False,
-    'legend.edgecolor': 'black',
-})
+RenderMode.use_interactive()
 
 # Matplotlib canvas class to create figure
 class MplCanvas(Canvas):
@@ -0,0 +1,104 @@
+import os
+import threading
+import importlib.util
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+
+import src.package.Importer as Importer
+
+#misc.py se carga directo del archivo: el __init__ de pyqt-labutils importa el dialogo de conexion, que necesita pyvisa
+_spec = importlib.util.spec_from_file_location('labutils_misc', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pyqt-labutils-master', 'misc.py'))
+labutils = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(labutils)
+
+PROGRESS_STEPS = 1000
+
+def format_bytes(n):
+    for unit in ['B', 'KB', 'MB']:
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} GB'
+
+#Importa archivos en un hilo aparte (BackgroundTask) y va mandando cada Dataset al hilo de la interfaz
+#a medida que termina, asi los graficos siguen respondiendo. El dialogo muestra bytes y filas leidas por archivo
+#y su boton Cancel corta el parseo en curso. Los archivos que no se pudieron importar quedan en failed.
+class FileImportTask(QtCore.QObject):
+    sig_progress = QtCore.pyqtSignal(str, 'qint64', 'qint64', 'qint64') #Bytes y filas pueden pasar de 2**31
+    sig_dataset = QtCore.pyqtSignal(str, object)
+    sig_error = QtCore.pyqtSignal(str)
+    sig_finished = QtCore.pyqtSignal()
+
+    def __init__(self, filepaths, parent=None):
+        super().__init__(parent)
+        self.filepaths = list(filepaths)
+        self.cancelled = threading.Event()
+        self.sizes = {f: os.path.getsize(f) if os.path.isfile(f) else 0 for f in self.filepaths}
+        self.done = {f: 0 for f in self.filepaths}
+        self.rows = {f: 0 for f in self.filepaths}
+        self.failed = []
+        self.task = None
+
+        icon = QtWidgets.QApplication.style().standardIcon(QtWidgets.QStyle.SP_FileDialogContentsView)
+        self.dialog = labutils.BackgroundTaskProgressDialog(icon, 'Importing files', self.describe(), cancel=True, parent=parent)
+        #Sin modal: mientras carga se puede seguir usando la ventana principal
+        self.dialog.setModal(False)
+        self.dialog.setWindowModality(Qt.NonModal)
+        self.dialog.progressBar.setMaximum(PROGRESS_STEPS)
+        self.dialog.rejected.connect(self.cancel)
+        self.dialog.destroyed.connect(self.forgetDialog)
+        self.sig_progress.connect(self.updateProgress)
+        self.sig_dataset.connect(self.checkDataset)
+        self.sig_error.connect(self.failed.append)
+
+    def start(self):
+        self.dialog.show()
+        self.task = labutils.BackgroundTask(parent=self, target=self.run, autostart=False)
+        self.task.sig_done.connect(self.finish)
+        self.task.start()
+        #sig_done llega antes de que el hilo termine, asi que la tarea se borra recien cuando termino el hilo.
+        #El quit del hilo pasa por este hilo, por eso no puede terminar antes de conectarlo.
+        self.task.thread.finished.connect(self.deleteLater)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def forgetDialog(self):
+        self.dialog = None
+
+    #Corre en el hilo del BackgroundTask: no tocar widgets desde aca, solo emitir señales
+    def run(self):
+        try:
+            for (f, ds) in Importer.import_datasets(self.filepaths, progress=self.sig_progress.emit, cancel=self.cancelled):
+                self.sig_dataset.emit(f, ds)
+        except Exception as e:
+            self.sig_error.emit(f'Import failed: {e!r}')
+
+    def finish(self, result=None):
+        if self.dialog is not None:
+            self.dialog.close()
+        self.sig_finished.emit()
+
+    def checkDataset(self, filepath, ds):
+        if isinstance(ds, ValueError):
+            self.failed.append(str(ds) if str(ds) else f'{os.path.basename(filepath)}: wrong file config')
+        elif isinstance(ds, Exception):
+            self.failed.append(f'{os.path.basename(filepath)}: {ds!r}')
+
+    def updateProgress(self, filepath, done, total, rows):
+        self.done[filepath] = done
+        self.sizes[filepath] = total
+        self.rows[filepath] = rows
+        if self.dialog is None:
+            return
+        self.dialog.progressBar.setValue(int(PROGRESS_STEPS * sum(self.done.values()) / max(1, sum(self.sizes.values()))))
+        self.dialog.infoLabel.setText(self.describe())
+
+    def describe(self):
+        lines = []
+        for f in self.filepaths:
+            line = f'{os.path.basename(f)}: {format_bytes(self.done[f])} / {format_bytes(self.sizes[f])}'
+            if self.rows[f]:
+                line += f', {self.rows[f]} rows'
+            lines.append(line)
+        return '\n'.join(lines)
@@ -1,24 +1,19 @@
 # Imports
 from PyQt5 import QtWidgets
+from PyQt5.QtCore import QTimer
+import os
 import matplotlib
-matplotlib.use('Agg')
+import src.package.RenderMode as RenderMode
+RenderMode.use_interactive()
 
 from matplotlib.figure import Figure
-from matplotlib.widgets import Cursor
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from src.package.PlotRenderer import PlotRenderer, axes_properties, restore_axes_properties
+from src.widgets.crosshair import Crosshair
 
-# Ensure using PyQt5 backend
-matplotlib.use('pgf')
-matplotlib.rcParams.update({
-    "pgf.texsystem": "pdflatex",
-    'font.family': 'serif',
-    # 'text.usetex': True,
-    'pgf.rcfonts': False,
-    'legend.fancybox': False,
-    'legend.edgecolor': 'black',
-    'savefig.format': 'pdf'
-})
+#Milisegundos sin cambios en el rango x antes de volver a diezmar lo visible (ver PlotRenderer.refine)
+REFINE_DELAY = 100
 
 class CustomNavigationToolbar(NavigationToolbar):
     toolitems = [t for t in NavigationToolbar.toolitems if
@@ -33,27 +28,44 @@ class MplCanvas(Canvas):
         Canvas.__init__(self, self.fig)
         Canvas.setSizePolicy(self, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         Canvas.updateGeometry(self)
-        # self.cursor = Cursor(self.ax, useblit=True, color='red', linewidth=0.3, linestyle='--')
+        self.plot_renderer = PlotRenderer(self.ax)
+        self.dirty = True #Hay que redibujarlo (ver RedrawScheduler)
+        self.export_full_resolution = False
+        self.crosshair = Crosshair(self)
+        #Al hacer zoom o pan se rediezma el rango visible, pero recien cuando se deja de mover
+        self.refineTimer = QTimer(self)
+        self.refineTimer.setSingleShot(True)
+        self.refineTimer.setInterval(REFINE_DELAY)
+        self.refineTimer.timeout.connect(self.refineVisibleRange)
+        self.ax.callbacks.connect('xlim_changed', lambda ax: self.refineTimer.start())
     
+    def refineVisibleRange(self):
+        if self.plot_renderer.refine():
+            self.draw_idle()
+
     def get_properties(self):
-        return {
-            "xlabel": self.ax.get_xlabel(),
-            "ylabel": self.ax.get_ylabel(),
-            "title": self.ax.get_title(),
-            "xlim": self.ax.get_xlim(),
-            "ylim": self.ax.get_ylim(),
-            "xscale": self.ax.get_xscale(),
-            "yscale": self.ax.get_yscale()
-        }
+        return axes_properties(self.ax)
 
     def restore_properties(self, props):
-        self.ax.set_xlabel(props['xlabel'])
-        self.ax.set_ylabel(props['ylabel'])
-        self.ax.set_title(props['title'])
-        self.ax.set_xlim(props['xlim'])
-        self.ax.set_ylim(props['ylim'])
-        self.ax.set_xscale(props['xscale'])
-        self.ax.set_yscale(props['yscale'])
+        restore_axes_properties(self.ax, props)
+
+    #Al exportar (savefig) se activa la configuracion de LaTeX (ver RenderMode), y las lineas diezmadas
+    #se pueden guardar con todas sus muestras
+    def print_figure(self, filename, *args, **kwargs):
+        fmt = kwargs.get('format') or (os.path.splitext(filename)[1][1:] if isinstance(filename, str) else '') or matplotlib.rcParams['savefig.format']
+        if RenderMode.export_backend(fmt.lower()) and 'backend' not in kwargs:
+            kwargs['backend'] = RenderMode.export_backend(fmt.lower())
+        swapped = []
+        if self.export_full_resolution:
+            for (line, (x, y)) in self.plot_renderer.full_data.items():
+                swapped.append((line, line.get_data(orig=True)))
+                line.set_data(x, y)
+        try:
+            with RenderMode.export_context():
+                return Canvas.print_figure(self, filename, *args, **kwargs)
+        finally:
+            for (line, data) in swapped:
+                line.set_data(*data)
         
 # Matplotlib widget
 class MplWidget(QtWidgets.QWidget):
@@ -61,7 +73,18 @@ class MplWidget(QtWidgets.QWidget):
         QtWidgets.QWidget.__init__(self, parent)   # Inherit from QWidget
         self.canvas = MplCanvas()                  # Create canvas object
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.fullres_action = self.toolbar.addAction('Full res')
+        self.fullres_action.setCheckable(True)
+        self.fullres_action.setToolTip('Save decimated lines with all their samples')
+        self.fullres_action.toggled.connect(self.setFullResolutionExport)
+        self.cursor_action = self.toolbar.addAction('Cursor')
+        self.cursor_action.setCheckable(True)
+        self.cursor_action.setToolTip('Show a crosshair that snaps to the nearest sample')
+        self.cursor_action.toggled.connect(self.canvas.crosshair.set_enabled)
         self.vbl = QtWidgets.QVBoxLayout()         # Set box for plotting
         self.vbl.addWidget(self.toolbar)
         self.vbl.addWidget(self.canvas)
-        self.setLayout(self.vbl)
\ No newline at end of file
+        self.setLayout(self.vbl)
+
+    def setFullResolutionExport(self, enabled):
+        self.canvas.export_full_resolution = enabled